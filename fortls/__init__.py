@@ -1,5 +1,3 @@
-from __future__ import print_function
-
 import json
 import os
 import pprint
@@ -536,23 +534,7 @@ def print_children(obj, indent=""):
 
 
 def _binary_stdio():
-    """Construct binary stdio streams (not text mode).
-    This seems to be different for Window/Unix Python2/3, so going by:
-        https://stackoverflow.com/questions/2850893/reading-binary-data-from-stdin
-    """
-    PY3K = sys.version_info >= (3, 0)
-
-    if PY3K:
-        stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
-    else:
-        # Python 2 on Windows opens sys.stdin in text mode, and
-        # binary data that read from it becomes corrupted on \r\n
-        if sys.platform == "win32":
-            # set sys.stdin to binary mode
-            import msvcrt
-
-            msvcrt.setmode(sys.stdin.fileno(), os.O_BINARY)
-            msvcrt.setmode(sys.stdout.fileno(), os.O_BINARY)
-        stdin, stdout = sys.stdin, sys.stdout
+    """Construct binary stdio streams (not text mode)"""
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
 
     return stdin, stdout
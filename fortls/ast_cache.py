@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from fortls import helper_functions
+from fortls.constants import log
+from fortls.objects import fortran_ast
+from fortls.version import __version__
+
+
+class FortranASTCache:
+    """On-disk cache of parsed file ASTs, persisting between sessions
+
+    Entries are stored per file path, along with the hash of the file contents
+    they were parsed from, hence a file only requires parsing again if it
+    has changed since it was last cached.
+    Files that require preprocessing are never cached, since their AST also
+    depends on the contents of any included files and macro definitions.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir: str = cache_dir
+
+    def _entry_path(self, path: str) -> str:
+        # ASTs pickled by a different fortls/Python version or keyword ordering
+        # are not interchangeable, so they are stored under different keys
+        key = "\n".join(
+            [
+                path,
+                __version__,
+                sys.version,
+                str(helper_functions.sort_keywords),
+            ]
+        )
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def get(self, file_obj) -> fortran_ast | None:
+        """Get the cached AST of a file loaded from disk
+
+        Parameters
+        ----------
+        file_obj : fortran_file
+            File object, with its contents loaded from disk
+
+        Returns
+        -------
+        fortran_ast | None
+            AST of the file if present in the cache and up to date, else None
+        """
+        if file_obj.preproc or file_obj.hash is None:
+            return None
+        try:
+            with open(self._entry_path(file_obj.path), "rb") as f:
+                file_hash, file_ast = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.debug("Failed to load cached AST for %s", file_obj.path, exc_info=True)
+            return None
+        if file_hash != file_obj.hash:
+            return None
+        file_ast.file = file_obj
+        return file_ast
+
+    def put(self, file_obj, file_ast: fortran_ast):
+        """Store the AST of a file loaded from disk in the cache
+
+        Parameters
+        ----------
+        file_obj : fortran_file
+            File object, with its contents loaded from disk
+        file_ast : fortran_ast
+            AST resulting from parsing `file_obj`
+        """
+        if file_obj.preproc or file_obj.hash is None:
+            return
+        # The file object is not stored, it is reattached when the AST is loaded
+        file_ast.file = None
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so no partial entries are ever read
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((file_obj.hash, file_ast), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._entry_path(file_obj.path))
+        except Exception:
+            log.debug("Failed to cache AST for %s", file_obj.path, exc_info=True)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            file_ast.file = file_obj
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
 import logging
-import sys
 from dataclasses import dataclass, field
 
 from fortls.regex_patterns import FortranRegularExpressions
 
-PY3K = sys.version_info >= (3, 0)
-
 log = logging.getLogger(__name__)
 
 # Global variables
@@ -67,6 +64,7 @@ FORTRAN_LITERAL = "0^=__LITERAL_INTERNAL_DUMMY_VAR_"
 
 @dataclass
 class VAR_info:
+    __slots__ = ("type_word", "keywords", "var_names")
     type_word: str
     keywords: list[str]
     var_names: list[str]
@@ -74,6 +72,7 @@ class VAR_info:
 
 @dataclass
 class SUB_info:
+    __slots__ = ("name", "args", "mod_flag", "keywords")
     name: str
     args: str
     mod_flag: bool
@@ -82,6 +81,7 @@ class SUB_info:
 
 @dataclass
 class SELECT_info:
+    __slots__ = ("type", "binding", "desc")
     type: int
     binding: str
     desc: str
@@ -89,6 +89,7 @@ class SELECT_info:
 
 @dataclass
 class CLASS_info:
+    __slots__ = ("name", "parent", "keywords")
     name: str
     parent: str
     keywords: str
@@ -96,6 +97,7 @@ class CLASS_info:
 
 @dataclass
 class USE_info:
+    __slots__ = ("mod_name", "only_list", "rename_map")
     mod_name: str
     only_list: set[str]
     rename_map: dict[str, str]
@@ -103,6 +105,7 @@ class USE_info:
 
 @dataclass
 class GEN_info:
+    __slots__ = ("bound_name", "pro_links", "vis_flag")
     bound_name: str
     pro_links: list[str]
     vis_flag: int
@@ -110,24 +113,28 @@ class GEN_info:
 
 @dataclass
 class SMOD_info:
+    __slots__ = ("name", "parent")
     name: str
     parent: str
 
 
 @dataclass
 class INT_info:
+    __slots__ = ("name", "abstract")
     name: str
     abstract: bool
 
 
 @dataclass
 class VIS_info:
+    __slots__ = ("type", "obj_names")
     type: int
     obj_names: list[str]
 
 
 @dataclass
 class INCLUDE_info:
+    __slots__ = ("line_number", "path", "file", "scope_objs")
     line_number: int
     path: str
     file: None  # fortran_file
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 
 from fortls.constants import KEYWORD_ID_DICT, KEYWORD_LIST, FRegex, log, sort_keywords
@@ -60,7 +62,7 @@ def detect_fixed_format(file_lines: list[str]) -> bool:
             return False
         # Trailing ampersand indicates free or intersection format
         if not FRegex.FIXED_COMMENT.match(line):
-            line_end = line.split("!")[0].strip()
+            line_end = line.partition("!")[0].strip()
             if len(line_end) > 0 and line_end[-1] == "&":
                 return False
     return True
@@ -111,6 +113,9 @@ def strip_strings(in_line: str, maintain_len: bool = False) -> str:
     def repl_dq(m):
         return '"{0}"'.format(" " * (len(m.group()) - 2))
 
+    # Nothing to strip, most lines do not contain any string literals
+    if ("'" not in in_line) and ('"' not in in_line):
+        return in_line
     if maintain_len:
         out_line = FRegex.SQ_STRING.sub(repl_sq, in_line)
         out_line = FRegex.DQ_STRING.sub(repl_dq, out_line)
@@ -161,6 +166,19 @@ def separate_def_list(test_str: str) -> list[str] | None:
     return def_list
 
 
+@lru_cache(maxsize=512)
+def _word_in_line_regex(word: str):
+    """Regex matching `word` where `FRegex.WORD` would match it as a whole word.
+    WORD matches greedily, so the word cannot be preceded by an identifier
+    character other than the digits of a number e.g. `1x`, nor followed by one.
+    None if `word` itself is not a WORD"""
+    if FRegex.WORD.fullmatch(word) is None:
+        return None
+    return re.compile(
+        rf"(?<!(?i:[a-z0-9_]))[0-9]*({re.escape(word)})(?!(?i:[a-z0-9_]))"
+    )
+
+
 def find_word_in_line(line: str, word: str) -> tuple[int, int]:
     """Find Fortran word in line
 
@@ -177,10 +195,11 @@ def find_word_in_line(line: str, word: str) -> tuple[int, int]:
         start and end positions (indices) of the word if not found it returns
         -1, len(word) -1"""
     i0 = -1
-    for poss_name in FRegex.WORD.finditer(line):
-        if poss_name.group() == word:
-            i0 = poss_name.start()
-            break
+    word_regex = _word_in_line_regex(word)
+    if word_regex is not None:
+        match = word_regex.search(line)
+        if match is not None:
+            i0 = match.start(1)
     return i0, i0 + len(word)
 
 
@@ -303,9 +322,11 @@ def only_dirs(paths: list[str], err_msg: list = []) -> list[str]:
 def set_keyword_ordering(sorted):
     global sort_keywords
     sort_keywords = sorted
+    _map_keywords.cache_clear()
 
 
-def map_keywords(keywords: list[str]):
+@lru_cache(maxsize=1024)
+def _map_keywords(keywords: tuple[str, ...]):
     mapped_keywords = []
     keyword_info = {}
     for keyword in keywords:
@@ -320,7 +341,14 @@ def map_keywords(keywords: list[str]):
                     keyword_info[keyword_prefix] = keyword_substring
     if sort_keywords:
         mapped_keywords.sort()
-    return mapped_keywords, keyword_info
+    return tuple(mapped_keywords), tuple(keyword_info.items())
+
+
+def map_keywords(keywords: list[str]):
+    # Declarations use the same few keyword combinations over and over, the
+    # results are copied since the objects they are assigned to modify them
+    mapped_keywords, keyword_info = _map_keywords(tuple(keywords))
+    return list(mapped_keywords), dict(keyword_info)
 
 
 def get_keywords(keywords, keyword_info={}):
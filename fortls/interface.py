@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 
 
@@ -10,6 +11,12 @@ class SetAction(argparse.Action):
         setattr(namespace, self.dest, set(values))
 
 
+def default_cache_dir() -> str:
+    """Per-user directory for the AST cache, following the XDG base directories"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "fortls")
+
+
 def commandline_args(name: str = "fortls") -> argparse.ArgumentParser:
     """Parses the command line arguments to the Language Server
 
@@ -25,8 +32,9 @@ def commandline_args(name: str = "fortls") -> argparse.ArgumentParser:
         usage="%(prog)s [options] [debug options]",
         formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=60),
         epilog=(
-            "All options starting with '--' can also be set in a configuration file, by"
-            " default named '.fortls' (other names/paths can specified via -c or"
+            "All options starting with '--', except --cache_dir, can also be set in a"
+            " configuration file, by default named '.fortls' (other names/paths can"
+            " specified via -c or"
             " --config). For more details see our documentation:"
             " https://gnikit.github.io/fortls/options.html#available-options"
         ),
@@ -138,6 +146,19 @@ def commandline_args(name: str = "fortls") -> argparse.ArgumentParser:
         metavar="DIRS",
         help="Folders to exclude from parsing",
     )
+    group.add_argument(
+        "--cache_dir",
+        type=str,
+        nargs="?",
+        const=default_cache_dir(),
+        metavar="DIR",
+        help=(
+            "Folder to store parsed files in, to skip parsing unchanged files"
+            " between sessions. Without DIR a per-user folder is used"
+            f" ({default_cache_dir()}). Can only be set from the command line"
+            " (default: disabled)"
+        ),
+    )
 
     # Autocomplete options -----------------------------------------------------
     group = parser.add_argument_group("Autocomplete options")
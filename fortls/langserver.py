@@ -17,6 +17,7 @@ from urllib.error import URLError
 from packaging import version
 
 # Local modules
+from fortls.ast_cache import FortranASTCache
 from fortls.constants import (
     CLASS_TYPE_ID,
     FORTRAN_LITERAL,
@@ -62,7 +63,7 @@ from fortls.version import __version__
 TYPE_DEF_REGEX = re.compile(r"[ ]*(TYPE|CLASS)[ ]*\([a-z0-9_ ]*$", re.I)
 
 
-def init_file(filepath, pp_defs, pp_suffixes, include_dirs, sort):
+def init_file(filepath, pp_defs, pp_suffixes, include_dirs, sort, cache_dir=None):
     #
     file_obj = fortran_file(filepath, pp_suffixes)
     err_str, _ = file_obj.load_from_disk()
@@ -74,7 +75,14 @@ def init_file(filepath, pp_defs, pp_suffixes, include_dirs, sort):
         # This is a bypass.
         # For more see on SO: shorturl.at/hwAG1
         set_keyword_ordering(sort)
-        file_ast = process_file(file_obj, pp_defs=pp_defs, include_dirs=include_dirs)
+        ast_cache = FortranASTCache(cache_dir) if cache_dir else None
+        file_ast = ast_cache.get(file_obj) if ast_cache else None
+        if file_ast is None:
+            file_ast = process_file(
+                file_obj, pp_defs=pp_defs, include_dirs=include_dirs
+            )
+            if ast_cache:
+                ast_cache.put(file_obj, file_ast)
     except:
         log.error("Error while parsing file %s", filepath, exc_info=True)
         return None, "Error during parsing"
@@ -100,6 +108,10 @@ class LangServer:
                 continue
             setattr(self, k, v)
 
+        # The AST cache is unpickled, so its location is never taken from the
+        # workspace's own configuration file, only from the command line
+        if self.cache_dir:
+            self.cache_dir = os.path.abspath(os.path.expanduser(self.cache_dir))
         self.sync_type: int = 2 if self.incremental_sync else 1
         self.post_messages = []
         self.FORTRAN_SRC_EXT_REGEX: Pattern[str] = src_file_exts()
@@ -1336,9 +1348,17 @@ class LangServer:
                     return False, err_string  # Error during file read
                 if not file_changed:
                     return False, None
-            ast_new = process_file(
-                file_obj, pp_defs=self.pp_defs, include_dirs=self.include_dirs
-            )
+            ast_new = None
+            # Only the contents of files read from disk can be cached
+            ast_cache = FortranASTCache(self.cache_dir) if self.cache_dir else None
+            if read_file and ast_cache:
+                ast_new = ast_cache.get(file_obj)
+            if ast_new is None:
+                ast_new = process_file(
+                    file_obj, pp_defs=self.pp_defs, include_dirs=self.include_dirs
+                )
+                if read_file and ast_cache:
+                    ast_cache.put(file_obj, ast_new)
             # Add the included read in pp_defs from to the ones specified in the
             # configuration file
             self.pp_defs = {**self.pp_defs, **file_obj.pp_defs}
@@ -1366,24 +1386,24 @@ class LangServer:
     def workspace_init(self):
 
         file_list = self._get_source_files()
-        # Process files
-        pool = Pool(processes=self.nthreads)
-        results = {}
-        for filepath in file_list:
-            results[filepath] = pool.apply_async(
+        # Process files, in batches of files per worker to limit the number of
+        # round trips between processes for large workspaces
+        with Pool(processes=self.nthreads) as pool:
+            results = pool.starmap(
                 init_file,
-                args=(
-                    filepath,
-                    self.pp_defs,
-                    self.pp_suffixes,
-                    self.include_dirs,
-                    self.sort_keywords,
-                ),
+                [
+                    (
+                        filepath,
+                        self.pp_defs,
+                        self.pp_suffixes,
+                        self.include_dirs,
+                        self.sort_keywords,
+                        self.cache_dir,
+                    )
+                    for filepath in file_list
+                ],
             )
-        pool.close()
-        pool.join()
-        for path, result in results.items():
-            result_obj = result.get()
+        for path, result_obj in zip(file_list, results):
             if result_obj[0] is None:
                 self.post_messages.append(
                     [1, f"Initialization failed for file '{path}': {result_obj[1]}"]
@@ -1,8 +1,7 @@
-from __future__ import annotations, print_function
+from __future__ import annotations
 
 import copy
 import os
-import re
 from dataclasses import replace
 from typing import Pattern
 
@@ -345,6 +344,8 @@ class fortran_diagnostic:
 
 # Fortran object classes
 class fortran_obj:
+    __slots__ = ("vis", "def_vis", "doc_str", "parent", "eline", "implicit_vars")
+
     def __init__(self):
         self.vis: int = 0
         self.def_vis: int = 0
@@ -469,6 +470,20 @@ class fortran_obj:
 
 
 class fortran_scope(fortran_obj):
+    __slots__ = (
+        "file_ast",
+        "sline",
+        "name",
+        "children",
+        "members",
+        "use",
+        "keywords",
+        "inherit",
+        "contains_start",
+        "implicit_line",
+        "FQSN",
+    )
+
     def __init__(self, file_ast, line_number: int, name: str, keywords: list = None):
         super().__init__()
         if keywords is None:
@@ -492,8 +507,10 @@ class fortran_scope(fortran_obj):
     def copy_from(self, copy_source: fortran_scope):
         # Pass the reference, we don't want shallow copy since that would still
         # result into 2 versions of attributes between copy_source and self
-        for k, v in copy_source.__dict__.items():
-            setattr(self, k, v)
+        for cls in type(copy_source).__mro__:
+            for k in getattr(cls, "__slots__", ()):
+                if hasattr(copy_source, k):
+                    setattr(self, k, getattr(copy_source, k))
 
     def add_use(
         self, use_mod, line_number, only_list: list = None, rename_map: dict = None
@@ -534,6 +551,9 @@ class fortran_scope(fortran_obj):
     def add_member(self, member):
         self.members.append(member)
 
+    def add_members(self, members):
+        self.members.extend(members)
+
     def get_children(self, public_only=False):
         if public_only:
             pub_children = []
@@ -716,6 +736,8 @@ class fortran_scope(fortran_obj):
 
 
 class fortran_module(fortran_scope):
+    __slots__ = ()
+
     def get_type(self, no_link=False):
         return MODULE_TYPE_ID
 
@@ -729,16 +751,22 @@ class fortran_module(fortran_scope):
 
 
 class fortran_include(fortran_scope):
+    __slots__ = ()
+
     def get_desc(self):
         return "INCLUDE"
 
 
 class fortran_program(fortran_module):
+    __slots__ = ()
+
     def get_desc(self):
         return "PROGRAM"
 
 
 class fortran_submodule(fortran_module):
+    __slots__ = ("ancestor_name", "ancestor_obj")
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -819,6 +847,15 @@ class fortran_submodule(fortran_module):
 
 
 class fortran_subroutine(fortran_scope):
+    __slots__ = (
+        "args",
+        "args_snip",
+        "arg_objs",
+        "in_children",
+        "missing_args",
+        "mod_scope",
+    )
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -1037,6 +1074,8 @@ class fortran_subroutine(fortran_scope):
 
 
 class fortran_function(fortran_subroutine):
+    __slots__ = ("result_name", "result_type", "result_obj")
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -1167,6 +1206,14 @@ class fortran_function(fortran_subroutine):
 
 
 class fortran_type(fortran_scope):
+    __slots__ = (
+        "in_children",
+        "inherit_var",
+        "inherit_tmp",
+        "inherit_version",
+        "abstract",
+    )
+
     def __init__(
         self, file_ast: fortran_ast, line_number: int, name: str, keywords: list
     ):
@@ -1334,6 +1381,8 @@ class fortran_type(fortran_scope):
 
 
 class fortran_block(fortran_scope):
+    __slots__ = ()
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
 
@@ -1351,6 +1400,8 @@ class fortran_block(fortran_scope):
 
 
 class fortran_do(fortran_block):
+    __slots__ = ()
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
 
@@ -1362,6 +1413,8 @@ class fortran_do(fortran_block):
 
 
 class fortran_where(fortran_block):
+    __slots__ = ()
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
 
@@ -1373,6 +1426,8 @@ class fortran_where(fortran_block):
 
 
 class fortran_if(fortran_block):
+    __slots__ = ()
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
 
@@ -1384,6 +1439,8 @@ class fortran_if(fortran_block):
 
 
 class fortran_associate(fortran_block):
+    __slots__ = ("assoc_links",)
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
         self.assoc_links = []
@@ -1419,6 +1476,8 @@ class fortran_associate(fortran_block):
 
 
 class fortran_enum(fortran_block):
+    __slots__ = ()
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str):
         super().__init__(file_ast, line_number, name)
 
@@ -1430,6 +1489,8 @@ class fortran_enum(fortran_block):
 
 
 class fortran_select(fortran_block):
+    __slots__ = ("select_type", "binding_name", "bound_var", "binding_type")
+
     def __init__(self, file_ast: fortran_ast, line_number: int, name: str, select_info):
         super().__init__(file_ast, line_number, name)
         self.select_type = select_info.type
@@ -1487,6 +1548,8 @@ class fortran_select(fortran_block):
 
 
 class fortran_int(fortran_scope):
+    __slots__ = ("mems", "abstract", "external")
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -1528,6 +1591,25 @@ class fortran_int(fortran_scope):
 
 
 class fortran_var(fortran_obj):
+    __slots__ = (
+        "file_ast",
+        "sline",
+        "name",
+        "desc",
+        "keywords",
+        "keyword_info",
+        "callable",
+        "children",
+        "use",
+        "link_obj",
+        "type_obj",
+        "is_const",
+        "is_external",
+        "param_val",
+        "link_name",
+        "FQSN",
+    )
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -1726,6 +1808,8 @@ class fortran_var(fortran_obj):
 
 
 class fortran_meth(fortran_var):
+    __slots__ = ("drop_arg", "pass_name")
+
     def __init__(
         self,
         file_ast: fortran_ast,
@@ -1874,6 +1958,9 @@ class fortran_ast:
         self.inherit_objs: list = []
         self.linkable_objs: list = []
         self.external_objs: list = []
+        # Variables and EXTERNALs indexed by name, used to link EXTERNAL defs
+        self.variables_by_name: dict[str, list] = {}
+        self.externals_by_name: dict[str, list] = {}
         self.none_scope = None
         self.inc_scope = None
         self.current_scope = None
@@ -1887,9 +1974,7 @@ class fortran_ast:
         if self.none_scope is not None:
             raise ValueError
         self.none_scope = fortran_program(self, 1, "main")
-        self.add_scope(
-            self.none_scope, re.compile(r"[ ]*END[ ]*PROGRAM", re.I), exportable=False
-        )
+        self.add_scope(self.none_scope, FRegex.END_NONE_SCOPE, exportable=False)
 
     def get_enc_scope_name(self):
         """Get current enclosing scope name"""
@@ -1954,8 +2039,9 @@ class fortran_ast:
             new_var.FQSN = self.none_scope.FQSN + "::" + new_var.name.lower()
         self.current_scope.add_child(new_var)
         self.variable_list.append(new_var)
+        self.variables_by_name.setdefault(new_var.name, []).append(new_var)
         if new_var.is_external:
-            self.external_objs.append(new_var)
+            self.add_external(new_var)
         if new_var.require_link():
             self.linkable_objs.append(new_var)
         self.last_obj = new_var
@@ -1963,15 +2049,28 @@ class fortran_ast:
             self.last_obj.add_doc(self.pending_doc)
             self.pending_doc = None
 
+    def add_external(self, new_var: fortran_var):
+        self.external_objs.append(new_var)
+        self.externals_by_name.setdefault(new_var.name, []).append(new_var)
+
     def add_int_member(self, key):
         self.current_scope.add_member(key)
 
+    def add_int_members(self, keys):
+        self.current_scope.add_members(keys)
+
     def add_private(self, name: str):
         self.private_list.append(self.enc_scope_name + "::" + name)
 
     def add_public(self, name: str):
         self.public_list.append(self.enc_scope_name + "::" + name)
 
+    def add_privates(self, names: list[str]):
+        self.private_list.extend(self.enc_scope_name + "::" + n for n in names)
+
+    def add_publics(self, names: list[str]):
+        self.public_list.extend(self.enc_scope_name + "::" + n for n in names)
+
     def add_use(
         self,
         mod_word: str,
@@ -1,10 +1,16 @@
-from __future__ import annotations, print_function
+from __future__ import annotations
 
 import hashlib
+import heapq
 import logging
 import os
 import re
 import sys
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
 
 # Python < 3.8 does not have typing.Literals
 try:
@@ -15,7 +21,6 @@ except ImportError:
 from fortls.constants import (
     DO_TYPE_ID,
     INTERFACE_TYPE_ID,
-    PY3K,
     SELECT_TYPE_ID,
     SUBMODULE_TYPE_ID,
     CLASS_info,
@@ -64,13 +69,109 @@ from fortls.objects import (
     fortran_where,
 )
 
-if not PY3K:
-    import io
+# Bound methods of the regular expressions used on every parsed line,
+# avoids the repeated attribute lookups through FRegex
+_ASSOCIATE_match = FRegex.ASSOCIATE.match
+_BLOCK_match = FRegex.BLOCK.match
+_CALL_match = FRegex.CALL.match
+_CONTAINS_match = FRegex.CONTAINS.match
+_DEFINED_finditer = FRegex.DEFINED.finditer
+_DO_match = FRegex.DO.match
+_END_match = FRegex.END.match
+_END_WORD_match = FRegex.END_WORD.match
+_ENUM_DEF_match = FRegex.ENUM_DEF.match
+_EXTENDS_match = FRegex.EXTENDS.match
+_EXTENDS_search = FRegex.EXTENDS.search
+_FIXED_COMMENT_match = FRegex.FIXED_COMMENT.match
+_FIXED_CONT_match = FRegex.FIXED_CONT.match
+_FIXED_DOC_match = FRegex.FIXED_DOC.match
+_FIXED_OPENMP_match = FRegex.FIXED_OPENMP.match
+_FREE_COMMENT_match = FRegex.FREE_COMMENT.match
+_FREE_CONT_match = FRegex.FREE_CONT.match
+_FREE_DOC_match = FRegex.FREE_DOC.match
+_FREE_OPENMP_match = FRegex.FREE_OPENMP.match
+_FUN_match = FRegex.FUN.match
+_GEN_ASSIGN_match = FRegex.GEN_ASSIGN.match
+_GENERIC_PRO_match = FRegex.GENERIC_PRO.match
+_IF_match = FRegex.IF.match
+_IMPLICIT_match = FRegex.IMPLICIT.match
+_IMPORT_match = FRegex.IMPORT.match
+_INCLUDE_match = FRegex.INCLUDE.match
+_INT_match = FRegex.INT.match
+_INT_STMNT_match = FRegex.INT_STMNT.match
+_KEYWORD_LIST_match = FRegex.KEYWORD_LIST.match
+_KIND_SPEC_match = FRegex.KIND_SPEC.match
+_MOD_match = FRegex.MOD.match
+_NON_DEF_match = FRegex.NON_DEF.match
+_PARAMETER_VAL_match = FRegex.PARAMETER_VAL.match
+_PP_ANY_match = FRegex.PP_ANY.match
+_PP_DEF_match = FRegex.PP_DEF.match
+_PP_EXPR_TOKEN_match = FRegex.PP_EXPR_TOKEN.match
+_PP_INCLUDE_match = FRegex.PP_INCLUDE.match
+_PP_REGEX_match = FRegex.PP_REGEX.match
+_PRO_LINK_match = FRegex.PRO_LINK.match
+_PROCEDURE_STMNT_match = FRegex.PROCEDURE_STMNT.match
+_PROG_match = FRegex.PROG.match
+_RESULT_match = FRegex.RESULT.match
+_SCOPE_DEF_match = FRegex.SCOPE_DEF.match
+_SELECT_DEFAULT_match = FRegex.SELECT_DEFAULT.match
+_SELECT_match = FRegex.SELECT.match
+_SELECT_TYPE_match = FRegex.SELECT_TYPE.match
+_SUB_match = FRegex.SUB.match
+_SUB_MOD_sub = FRegex.SUB_MOD.sub
+_SUB_PAREN_match = FRegex.SUB_PAREN.match
+_SUBMOD_match = FRegex.SUBMOD.match
+_TATTR_LIST_match = FRegex.TATTR_LIST.match
+_THEN_search = FRegex.THEN.search
+_TYPE_DEF_match = FRegex.TYPE_DEF.match
+_TYPE_STMNT_match = FRegex.TYPE_STMNT.match
+_USE_match = FRegex.USE.match
+_VAR_match = FRegex.VAR.match
+_VIS_match = FRegex.VIS.match
+_WHERE_match = FRegex.WHERE.match
+_WORD_findall = FRegex.WORD.findall
+_WORD_finditer = FRegex.WORD.finditer
+_WORD_match = FRegex.WORD.match
+_WORD_search = FRegex.WORD.search
+
+# Classifies the statements skipped or handled before the definition tests
+# in a single match, named by the group of the first pattern matching. The
+# patterns are tried in the same order they are tested in `process_file`
+_STMT_CLASS_match = re.compile(
+    "|".join(
+        f"(?P<{name}>{regex.pattern})"
+        for name, regex in (
+            ("end", FRegex.END_WORD),
+            ("non_def", FRegex.NON_DEF),
+            ("implicit", FRegex.IMPLICIT),
+            ("contains", FRegex.CONTAINS),
+        )
+    ),
+    re.I,
+).match
+
+# Same as `_STMT_CLASS_match` for the constructs read by `read_block_def`
+_BLOCK_CLASS_match = re.compile(
+    "|".join(
+        f"(?P<{name}>{regex.pattern})"
+        for name, regex in (
+            ("block", FRegex.BLOCK),
+            ("do", FRegex.DO),
+            ("where", FRegex.WHERE),
+            ("if", FRegex.IF),
+        )
+    ),
+    re.I,
+).match
 
 
+@lru_cache(maxsize=2048)
 def get_line_context(line: str) -> tuple[str, None] | tuple[str, str]:
     """Get context of ending position in line (for completion)
 
+    The context only depends on the line itself, so results are cached for
+    repeated completion requests on the same line
+
     Parameters
     ----------
     line : str
@@ -103,37 +204,37 @@ def get_line_context(line: str) -> tuple[str, None] | tuple[str, str]:
         else:
             return "mod_only", None
     # Test for interface procedure link
-    if FRegex.PRO_LINK.match(line):
+    if _PRO_LINK_match(line):
         return "pro_link", None
     # Test if scope declaration or end statement (no completion provided)
-    if FRegex.SCOPE_DEF.match(line) or FRegex.END.match(line):
+    if _SCOPE_DEF_match(line) or _END_match(line):
         return "skip", None
     # Test if import statement
-    if FRegex.IMPORT.match(line):
+    if _IMPORT_match(line):
         return "import", None
     # Test if visibility statement
-    if FRegex.VIS.match(line):
+    if _VIS_match(line):
         return "vis", None
     # In type-def
     type_def = False
-    if FRegex.TYPE_DEF.match(line) is not None:
+    if _TYPE_DEF_match(line) is not None:
         type_def = True
     # Test if in call statement
     if lev1_end == len(line):
-        if FRegex.CALL.match(last_level) is not None:
+        if _CALL_match(last_level) is not None:
             return "call", None
     # Test if variable definition using type/class or procedure
     if (len(sections) == 1) and (sections[0][0] >= 1):
         # Get string one level up
         test_str, _ = get_paren_level(line[: sections[0][0] - 1])
-        if (FRegex.TYPE_STMNT.match(test_str) is not None) or (
-            type_def and FRegex.EXTENDS.search(test_str) is not None
+        if (_TYPE_STMNT_match(test_str) is not None) or (
+            type_def and _EXTENDS_search(test_str) is not None
         ):
             return "type_only", None
-        if FRegex.PROCEDURE_STMNT.match(test_str) is not None:
+        if _PROCEDURE_STMNT_match(test_str) is not None:
             return "int_only", None
     # Only thing on line?
-    if FRegex.INT_STMNT.match(line) is not None:
+    if _INT_STMNT_match(line) is not None:
         return "first", None
     # Default or skip context
     if type_def:
@@ -145,29 +246,43 @@ def get_line_context(line: str) -> tuple[str, None] | tuple[str, str]:
 def parse_var_keywords(test_str: str) -> tuple[list[str], str]:
     """Parse Fortran variable declaration keywords"""
     # Needs to be this way and not simply call finditer because no regex can
-    # capture nested parenthesis
-    keyword_match = FRegex.KEYWORD_LIST.match(test_str)
+    # capture nested parenthesis. Matches continue from `pos` in the string,
+    # which is only sliced once at the end
+    keyword_match = _KEYWORD_LIST_match(test_str)
     keywords = []
+    pos = 0
     while keyword_match:
-        tmp_str = re.sub(r"^[, ]*", "", keyword_match.group(0))
-        test_str = test_str[keyword_match.end(0) :]
+        # Keyword without the leading comma and spaces
+        tmp_str = keyword_match.group(1)
+        pos = keyword_match.end(0)
         if tmp_str.lower().startswith("dimension"):
-            match_char = find_paren_match(test_str)
+            match_char = find_paren_match(test_str[pos:])
             if match_char < 0:
                 break  # Incomplete dimension statement
             else:
-                tmp_str += test_str[: match_char + 1]
-                test_str = test_str[match_char + 1 :]
-        tmp_str = re.sub(r"^[, ]*", "", tmp_str)
-        keywords.append(tmp_str.strip().upper())
-        keyword_match = FRegex.KEYWORD_LIST.match(test_str)
-    return keywords, test_str
+                tmp_str += test_str[pos : pos + match_char + 1]
+                pos += match_char + 1
+        keywords.append(sys.intern(tmp_str.strip().upper()))
+        keyword_match = _KEYWORD_LIST_match(test_str, pos)
+    return keywords, test_str[pos:]
+
+
+def parse_sub_keywords(line: str) -> tuple[list[str], str]:
+    """Parse and remove SUBROUTINE/FUNCTION modifiers e.g. PURE, ELEMENTAL
+    in a single pass over the line"""
+    keywords = []
+
+    def add_keyword(match):
+        keywords.append(match.group(1))
+        return ""
+
+    return keywords, _SUB_MOD_sub(add_keyword, line)
 
 
 def read_var_def(line: str, type_word: str = None, fun_only: bool = False):
     """Attempt to read variable definition line"""
     if type_word is None:
-        type_match = FRegex.VAR.match(line)
+        type_match = _VAR_match(line)
         if type_match is None:
             return None
         else:
@@ -176,11 +291,11 @@ def read_var_def(line: str, type_word: str = None, fun_only: bool = False):
     else:
         trailing_line = line[len(type_word) :]
     type_word = type_word.upper()
-    trailing_line = trailing_line.split("!")[0]
+    trailing_line = trailing_line.partition("!")[0]
     if len(trailing_line) == 0:
         return None
     #
-    kind_match = FRegex.KIND_SPEC.match(trailing_line)
+    kind_match = _KIND_SPEC_match(trailing_line)
     if kind_match is not None:
         kind_str = kind_match.group(1).replace(" ", "")
         type_word += kind_str
@@ -200,22 +315,24 @@ def read_var_def(line: str, type_word: str = None, fun_only: bool = False):
         # Make sure next character is space or comma or colon
         if not trailing_line[0] in (" ", ",", ":"):
             return None
-    #
+    # The same few types are declared throughout a project, intern them so the
+    # descriptions of all the variables/results declared with a type share one
+    # string
+    type_word = sys.intern(type_word)
     keywords, trailing_line = parse_var_keywords(trailing_line)
     # Check if this is a function definition
     fun_def = read_fun_def(trailing_line, RESULT_sig(type=type_word, keywords=keywords))
     if (fun_def is not None) or fun_only:
         return fun_def
     #
-    line_split = trailing_line.split("::")
-    if len(line_split) == 1:
+    _, has_colons, names_str = trailing_line.partition("::")
+    if not has_colons:
         if len(keywords) > 0:
             var_words = None
         else:
-            trailing_line = line_split[0]
             var_words = separate_def_list(trailing_line.strip())
     else:
-        trailing_line = line_split[1]
+        trailing_line = names_str.partition("::")[0]
         var_words = separate_def_list(trailing_line.strip())
         if var_words is None:
             var_words = []
@@ -245,10 +362,8 @@ def read_fun_def(
     tuple[Literal["fun"], FUN_sig] | None
         a named tuple
     """
-    # Get all the keyword modifier mathces
-    keywords = re.findall(FRegex.SUB_MOD, line)
-    # remove modifiers from line
-    line = re.sub(FRegex.SUB_MOD, "", line)
+    # Get all the keyword modifier matches and remove them from the line
+    keywords, line = parse_sub_keywords(line)
 
     # Try and get the result type
     # Recursively will call read_var_def which will then call read_fun_def
@@ -259,26 +374,23 @@ def read_fun_def(
             # Update keywords for function into dataclass
             tmp_var[1].keywords = keywords
             return tmp_var
-    fun_match = FRegex.FUN.match(line)
+    fun_match = _FUN_match(line)
     if fun_match is None:
         return None
     #
     name = fun_match.group(1)
-    trailing_line = line[fun_match.end(0) :].split("!")[0]
+    trailing_line = line[fun_match.end(0) :].partition("!")[0]
     trailing_line = trailing_line.strip()
     #
-    paren_match = FRegex.SUB_PAREN.match(trailing_line)
+    paren_match = _SUB_PAREN_match(trailing_line)
     args = ""
     if paren_match is not None:
-        word_match = FRegex.WORD.findall(paren_match.group(0))
-        if word_match is not None:
-            word_match = [word for word in word_match]
-            args = ",".join(word_match)
+        args = ",".join(_WORD_findall(paren_match.group(0)))
         trailing_line = trailing_line[paren_match.end(0) :]
 
     # Extract if possible the variable name of the result()
     trailing_line = trailing_line.strip()
-    results_match = FRegex.RESULT.match(trailing_line)
+    results_match = _RESULT_match(trailing_line)
     if result is None:
         result = RESULT_sig()
     if results_match:
@@ -288,65 +400,65 @@ def read_fun_def(
 
 def read_sub_def(line: str, mod_flag: bool = False):
     """Attempt to read SUBROUTINE definition line"""
-    # Get all the keyword modifier mathces
-    keywords = re.findall(FRegex.SUB_MOD, line)
-    # remove modifiers from line
-    line = re.sub(FRegex.SUB_MOD, "", line)
-    sub_match = FRegex.SUB.match(line)
+    # Get all the keyword modifier matches and remove them from the line
+    keywords, line = parse_sub_keywords(line)
+    sub_match = _SUB_match(line)
     if sub_match is None:
         return None
     #
     name = sub_match.group(1)
-    trailing_line = line[sub_match.end(0) :].split("!")[0]
+    trailing_line = line[sub_match.end(0) :].partition("!")[0]
     trailing_line = trailing_line.strip()
     #
-    paren_match = FRegex.SUB_PAREN.match(trailing_line)
+    paren_match = _SUB_PAREN_match(trailing_line)
     args = ""
     if paren_match is not None:
-        word_match = FRegex.WORD.findall(paren_match.group(0))
-        if word_match is not None:
-            word_match = [word for word in word_match]
-            args = ",".join(word_match)
+        args = ",".join(_WORD_findall(paren_match.group(0)))
         trailing_line = trailing_line[paren_match.end(0) :]
     return "sub", SUB_info(name, args, mod_flag, keywords)
 
 
 def read_block_def(line: str):
     """Attempt to read BLOCK definition line"""
-    block_match = FRegex.BLOCK.match(line)
-    if block_match is not None:
+    # The lines are stripped of comments, and string literals cannot appear
+    # before the end of any of the matched prefixes
+    construct_match = _BLOCK_CLASS_match(line)
+    if construct_match is None:
+        return None
+    construct = construct_match.lastgroup
+    if construct == "block":
+        block_match = _BLOCK_match(line)
         name = block_match.group(1)
         if name is not None:
             name = name.replace(":", " ").strip()
         return "block", name
     #
-    line_stripped = strip_strings(line, maintain_len=True)
-    line_no_comment = line_stripped.split("!")[0].rstrip()
-    do_match = FRegex.DO.match(line_no_comment)
-    if do_match is not None:
+    if construct == "do":
+        do_match = _DO_match(line)
         return "do", do_match.group(1).strip()
     #
-    where_match = FRegex.WHERE.match(line_no_comment)
-    if where_match is not None:
+    if construct == "where":
+        where_match = _WHERE_match(line)
         trailing_line = line[where_match.end(0) :]
         close_paren = find_paren_match(trailing_line)
         if close_paren < 0:
             return "where", True
-        if FRegex.WORD.match(trailing_line[close_paren + 1 :].strip()):
+        if _WORD_match(trailing_line[close_paren + 1 :].strip()):
             return "where", True
         else:
             return "where", False
     #
-    if_match = FRegex.IF.match(line_no_comment)
-    if if_match is not None:
-        then_match = FRegex.THEN.search(line_no_comment)
-        if then_match is not None:
-            return "if", None
+    # THEN has to end the line, which string literals might contain
+    line_stripped = strip_strings(line, maintain_len=True)
+    line_no_comment = line_stripped.partition("!")[0].rstrip()
+    then_match = _THEN_search(line_no_comment)
+    if then_match is not None:
+        return "if", None
     return None
 
 
 def read_associate_def(line: str):
-    assoc_match = FRegex.ASSOCIATE.match(line)
+    assoc_match = _ASSOCIATE_match(line)
     if assoc_match is not None:
         trailing_line = line[assoc_match.end(0) :]
         match_char = find_paren_match(trailing_line)
@@ -356,15 +468,18 @@ def read_associate_def(line: str):
         return "assoc", var_words
 
 
+_select_word_types = {"case": 1, "type": 2}
+
+
 def read_select_def(line: str):
     """Attempt to read SELECT definition line"""
-    select_match = FRegex.SELECT.match(line)
+    select_match = _SELECT_match(line)
     select_desc = None
     select_binding = None
     if select_match is None:
-        select_type_match = FRegex.SELECT_TYPE.match(line)
+        select_type_match = _SELECT_TYPE_match(line)
         if select_type_match is None:
-            select_default_match = FRegex.SELECT_DEFAULT.match(line)
+            select_default_match = _SELECT_DEFAULT_match(line)
             if select_default_match is None:
                 return None
             else:
@@ -373,50 +488,48 @@ def read_select_def(line: str):
         select_desc = select_type_match.group(1).upper()
         select_binding = select_type_match.group(2)
     else:
-        select_word = select_match.group(1)
-        select_type = -1
-        if select_word.lower().startswith("case"):
-            select_type = 1
-        elif select_word.lower().startswith("type"):
-            select_type = 2
+        select_word = select_match.group(1).lower()
+        select_type = _select_word_types.get(select_word, -1)
         select_binding = select_match.group(2)
     return "select", SELECT_info(select_type, select_binding, select_desc)
 
 
 def read_type_def(line: str):
     """Attempt to read TYPE definition line"""
-    type_match = FRegex.TYPE_DEF.match(line)
+    type_match = _TYPE_DEF_match(line)
     if type_match is None:
         return None
-    trailing_line = line[type_match.end(1) :].split("!")[0]
+    trailing_line = line[type_match.end(1) :].partition("!")[0]
     trailing_line = trailing_line.strip()
     # Parse keywords
-    keyword_match = FRegex.TATTR_LIST.match(trailing_line)
+    keyword_match = _TATTR_LIST_match(trailing_line)
     keywords: list[str] = []
     parent = None
+    pos = 0
     while keyword_match is not None:
-        keyword_strip = keyword_match.group(0).replace(",", " ").strip().upper()
-        extend_match = FRegex.EXTENDS.match(keyword_strip)
+        # The attribute group holds no commas or surrounding spaces
+        keyword_strip = sys.intern(keyword_match.group(1).upper())
+        extend_match = _EXTENDS_match(keyword_strip)
         if extend_match is not None:
-            parent = extend_match.group(1).lower()
+            parent = sys.intern(extend_match.group(1).lower())
         else:
             keywords.append(keyword_strip)
         #
-        trailing_line = trailing_line[keyword_match.end(0) :]
-        keyword_match = FRegex.TATTR_LIST.match(trailing_line)
+        pos = keyword_match.end(0)
+        keyword_match = _TATTR_LIST_match(trailing_line, pos)
+    trailing_line = trailing_line[pos:]
     # Get name
-    line_split = trailing_line.split("::")
-    if len(line_split) == 1:
+    _, has_colons, name_str = trailing_line.partition("::")
+    if not has_colons:
         if len(keywords) > 0 and parent is None:
             return None
         else:
-            if trailing_line.split("(")[0].strip().lower() == "is":
+            if trailing_line.partition("(")[0].strip().lower() == "is":
                 return None
-            trailing_line = line_split[0]
     else:
-        trailing_line = line_split[1]
+        trailing_line = name_str.partition("::")[0]
     #
-    word_match = FRegex.WORD.match(trailing_line.strip())
+    word_match = _WORD_match(trailing_line.strip())
     if word_match is not None:
         name = word_match.group(0)
     else:
@@ -427,7 +540,7 @@ def read_type_def(line: str):
 
 def read_enum_def(line: str):
     """Attempt to read ENUM definition line"""
-    enum_match = FRegex.ENUM_DEF.match(line)
+    enum_match = _ENUM_DEF_match(line)
     if enum_match is not None:
         return "enum", None
     return None
@@ -435,11 +548,11 @@ def read_enum_def(line: str):
 
 def read_generic_def(line: str):
     """Attempt to read generic procedure definition line"""
-    generic_match = FRegex.GENERIC_PRO.match(line)
+    generic_match = _GENERIC_PRO_match(line)
     if generic_match is None:
         return None
     #
-    trailing_line = line[generic_match.end(0) - 1 :].split("!")[0].strip()
+    trailing_line = line[generic_match.end(0) - 1 :].partition("!")[0].strip()
     if len(trailing_line) == 0:
         return None
     # Set visibility
@@ -455,14 +568,15 @@ def read_generic_def(line: str):
     if i1 < 0:
         return None
     bound_name: str = trailing_line[:i1].strip()
-    if FRegex.GEN_ASSIGN.match(bound_name):
+    if _GEN_ASSIGN_match(bound_name):
         return None
     pro_list = trailing_line[i1 + 2 :].split(",")
     #
     pro_out: list[str] = []
     for bound_pro in pro_list:
-        if len(bound_pro.strip()) > 0:
-            pro_out.append(bound_pro.strip())
+        bound_pro = bound_pro.strip()
+        if len(bound_pro) > 0:
+            pro_out.append(bound_pro)
     if len(pro_out) == 0:
         return None
     #
@@ -471,7 +585,7 @@ def read_generic_def(line: str):
 
 def read_mod_def(line: str):
     """Attempt to read MODULE and MODULE PROCEDURE definition lines"""
-    mod_match = FRegex.MOD.match(line)
+    mod_match = _MOD_match(line)
     if mod_match is None:
         return None
     else:
@@ -500,15 +614,15 @@ def read_mod_def(line: str):
 
 def read_submod_def(line: str):
     """Attempt to read SUBMODULE definition line"""
-    submod_match = FRegex.SUBMOD.match(line)
+    submod_match = _SUBMOD_match(line)
     if submod_match is None:
         return None
     else:
         parent_name = None
         name = None
-        trailing_line = line[submod_match.end(0) :].split("!")[0]
+        trailing_line = line[submod_match.end(0) :].partition("!")[0]
         trailing_line = trailing_line.strip()
-        parent_match = FRegex.WORD.match(trailing_line)
+        parent_match = _WORD_match(trailing_line)
         if parent_match is not None:
             parent_name = parent_match.group(0).lower()
             if len(trailing_line) > parent_match.end(0) + 1:
@@ -516,7 +630,7 @@ def read_submod_def(line: str):
             else:
                 trailing_line = ""
         #
-        name_match = FRegex.WORD.search(trailing_line)
+        name_match = _WORD_search(trailing_line)
         if name_match is not None:
             name = name_match.group(0).lower()
         return "smod", SMOD_info(name, parent_name)
@@ -524,7 +638,7 @@ def read_submod_def(line: str):
 
 def read_prog_def(line: str):
     """Attempt to read PROGRAM definition line"""
-    prog_match = FRegex.PROG.match(line)
+    prog_match = _PROG_match(line)
     if prog_match is None:
         return None
     else:
@@ -533,7 +647,7 @@ def read_prog_def(line: str):
 
 def read_int_def(line: str):
     """Attempt to read INTERFACE definition line"""
-    int_match = FRegex.INT.match(line)
+    int_match = _INT_match(line)
     if int_match is None:
         return None
     else:
@@ -546,29 +660,35 @@ def read_int_def(line: str):
         return "int", INT_info(int_match.group(2), is_abstract)
 
 
+# Shared, read-only ONLY list and renames for USE statements without ONLY
+_EMPTY_ONLY_LIST: frozenset = frozenset()
+_EMPTY_RENAME_MAP = MappingProxyType({})
+
+
 def read_use_stmt(line: str):
     """Attempt to read USE statement"""
-    use_match = FRegex.USE.match(line)
+    use_match = _USE_match(line)
     if use_match is None:
         return None
 
-    trailing_line = line[use_match.end(0) :].lower()
     use_mod = use_match.group(2)
+    if not use_match.group(3):
+        return "use", USE_info(use_mod, _EMPTY_ONLY_LIST, _EMPTY_RENAME_MAP)
+    trailing_line = line[use_match.end(0) :].lower()
     only_list: set[str] = set()
     rename_map: dict[str, str] = {}
-    if use_match.group(3):
-        for only_stmt in trailing_line.split(","):
-            only_split = only_stmt.split("=>")
-            only_name = only_split[0].strip()
-            only_list.add(only_name)
-            if len(only_split) == 2:
-                rename_map[only_name] = only_split[1].strip()
+    for only_stmt in trailing_line.split(","):
+        only_name, rename_op, rename_name = only_stmt.partition("=>")
+        only_name = only_name.strip()
+        only_list.add(only_name)
+        if rename_op:
+            rename_map[only_name] = rename_name.strip()
     return "use", USE_info(use_mod, only_list, rename_map)
 
 
 def read_imp_stmt(line: str):
     """Attempt to read IMPORT statement"""
-    import_match = FRegex.IMPORT.match(line)
+    import_match = _IMPORT_match(line)
     if import_match is None:
         return None
 
@@ -579,7 +699,7 @@ def read_imp_stmt(line: str):
 
 def read_inc_stmt(line: str):
     """Attempt to read INCLUDE statement"""
-    inc_match = FRegex.INCLUDE.match(line)
+    inc_match = _INCLUDE_match(line)
     if inc_match is None:
         return None
     else:
@@ -589,15 +709,15 @@ def read_inc_stmt(line: str):
 
 def read_vis_stmnt(line: str):
     """Attempt to read PUBLIC/PRIVATE statement"""
-    vis_match = FRegex.VIS.match(line)
+    vis_match = _VIS_match(line)
     if vis_match is None:
         return None
     else:
         vis_type = 0
         if vis_match.group(1).lower() == "private":
             vis_type = 1
-        trailing_line = line[vis_match.end(0) :].split("!")[0]
-        mod_words = FRegex.WORD.findall(trailing_line)
+        trailing_line = line[vis_match.end(0) :].partition("!")[0]
+        mod_words = _WORD_findall(trailing_line)
         return "vis", VIS_info(vis_type, mod_words)
 
 
@@ -621,6 +741,89 @@ def_tests = [
     read_vis_stmnt,
 ]
 
+# Every definition regex requires one of these keywords as the prefix of the
+# first word of the line, hence lines can be matched against only the
+# relevant subset of `def_tests`. Function prefixes e.g. `ELEMENTAL` are
+# stripped anywhere in the line, so type words can also start a function
+_def_keyword_tests = {
+    "integer": [read_var_def, read_fun_def],
+    "real": [read_var_def, read_fun_def],
+    "double": [read_var_def, read_fun_def],
+    "complex": [read_var_def, read_fun_def],
+    "character": [read_var_def, read_fun_def],
+    "logical": [read_var_def, read_fun_def],
+    "procedure": [read_var_def, read_fun_def],
+    "external": [read_var_def, read_fun_def],
+    "class": [read_var_def, read_fun_def, read_select_def],
+    "type": [read_var_def, read_fun_def, read_select_def, read_type_def],
+    "pure": [read_sub_def, read_fun_def],
+    "impure": [read_sub_def, read_fun_def],
+    "elemental": [read_sub_def, read_fun_def],
+    "recursive": [read_sub_def, read_fun_def],
+    "subroutine": [read_sub_def],
+    "function": [read_fun_def],
+    "block": [read_block_def],
+    "do": [read_block_def],
+    "where": [read_block_def],
+    "if": [read_block_def],
+    "associate": [read_associate_def],
+    "select": [read_select_def],
+    "enum": [read_enum_def],
+    "use": [read_use_stmt],
+    "import": [read_imp_stmt],
+    "abstract": [read_int_def],
+    "interface": [read_int_def],
+    "generic": [read_generic_def],
+    "module": [read_mod_def],
+    "program": [read_prog_def],
+    "submodule": [read_submod_def],
+    "include": [read_inc_stmt],
+    "public": [read_vis_stmnt],
+    "private": [read_vis_stmnt],
+}
+_def_keyword_lens = sorted({len(key) for key in _def_keyword_tests})
+
+
+def get_def_tests(line: str) -> list:
+    """Get the definition tests that can match a line, based on its first word
+
+    BLOCK, DO, IF and SELECT constructs can be labelled e.g. `outer: do i=1,n`,
+    in which case the word following the label is checked as well.
+
+    Parameters
+    ----------
+    line : str
+        file line, stripped of comments
+
+    Returns
+    -------
+    list
+        The subset of `def_tests` that could match the line, in order
+    """
+
+    def add_tests(word: str):
+        word = word.lower()
+        for n in _def_keyword_lens:
+            if n > len(word):
+                break
+            for test in _def_keyword_tests.get(word[:n], ()):
+                if test not in tests:
+                    tests.append(test)
+
+    tests = []
+    word_match = _WORD_match(line.lstrip(" "))
+    if word_match is None:
+        return tests
+    add_tests(word_match.group(0))
+    trailing_line = line.lstrip(" ")[word_match.end(0) :].lstrip(" ")
+    if trailing_line.startswith(":") and not trailing_line.startswith("::"):
+        label_match = _WORD_match(trailing_line[1:].lstrip(" "))
+        if label_match is not None:
+            add_tests(label_match.group(0))
+    if len(tests) > 1:
+        tests.sort(key=def_tests.index)
+    return tests
+
 
 def find_external_type(
     file_ast: fortran_ast, desc_string: str, name_stripped: str
@@ -632,17 +835,16 @@ def find_external_type(
         return False
     counter = 0
     # Definition without EXTERNAL has already been parsed
-    for v in file_ast.variable_list:
-        if name_stripped == v.name:
-            # If variable is already in external objs it has
-            # been parsed correctly so exit
-            if v in file_ast.external_objs:
-                return False
+    for v in file_ast.variables_by_name.get(name_stripped, []):
+        # If variable is already in external objs it has
+        # been parsed correctly so exit
+        if v in file_ast.externals_by_name.get(name_stripped, []):
+            return False
 
-            v.set_external_attr()
-            file_ast.external_objs.append(v)
-            counter += 1
-            # TODO: do I need to update AST any more?
+        v.set_external_attr()
+        file_ast.add_external(v)
+        counter += 1
+        # TODO: do I need to update AST any more?
     if counter == 1:
         return True
     else:
@@ -655,9 +857,7 @@ def find_external_attr(
     """Check if this NORMAL Fortran variable is in the
     external_objs with only EXTERNAL as its type"""
     counter = 0
-    for v in file_ast.external_objs:
-        if v.name != name_stripped:
-            continue
+    for v in file_ast.externals_by_name.get(name_stripped, []):
         if v.desc.upper() != "EXTERNAL":
             continue
         # We do this once
@@ -723,7 +923,82 @@ def find_external(
     return False
 
 
+def find_free_cont(line: str) -> tuple[int, int]:
+    """Find the first `&` and `!` of a free format line outside of strings
+
+    Parameters
+    ----------
+    line : str
+        file line
+
+    Returns
+    -------
+    tuple[int, int]
+        Indices of the `&` (-1 if not present) and of the `!`, which is set to
+        one past the `&` if the line has no comment
+    """
+    # Stripping strings cannot introduce an `&`
+    if "&" not in line:
+        return -1, 0
+    line_stripped = strip_strings(line, maintain_len=True)
+    iAmper = line_stripped.find("&")
+    iComm = line_stripped.find("!")
+    if iComm < 0:
+        iComm = iAmper + 1
+    return iAmper, iComm
+
+
+@lru_cache(maxsize=4096)
+def statement_requires_reparse(line: str) -> bool:
+    """Check if a changed statement can alter the AST of its file
+
+    The result only depends on the statement, which is often checked again
+    while it is being edited, hence results are cached
+
+    Parameters
+    ----------
+    line : str
+        Statement, stripped of line labels and comments
+
+    Returns
+    -------
+    bool
+        True if the statement is a definition or affects the scopes
+    """
+    # Various single line tests
+    if _END_WORD_match(line):
+        return True
+    if _IMPLICIT_match(line):
+        return True
+    if _CONTAINS_match(line):
+        return True
+    # Generic "non-definition" line
+    if _NON_DEF_match(line):
+        return False
+    # Loop through tests
+    for test in get_def_tests(line):
+        if test(line):
+            return True
+    return False
+
+
 class fortran_file:
+    __slots__ = (
+        "path",
+        "contents_split",
+        "contents_pp",
+        "pp_defs",
+        "nLines",
+        "fixed",
+        "preproc",
+        "ast",
+        "hash",
+        "stat_key",
+        "code_line_cache",
+        "lower_code_line_cache",
+        "fixed_cont_cache",
+    )
+
     def __init__(self, path: str = None, pp_suffixes: list = None):
         self.path: str = path
         self.contents_split: list = []
@@ -734,6 +1009,12 @@ class fortran_file:
         self.preproc: bool = False
         self.ast: fortran_ast = None
         self.hash: str = None
+        self.stat_key: tuple[int, int] = None
+        # Results of get_code_line and of fixed format continuation tests,
+        # cleared whenever the contents change
+        self.code_line_cache: dict = {}
+        self.lower_code_line_cache: dict = {}
+        self.fixed_cont_cache: dict = {}
         if path:
             _, file_ext = os.path.splitext(os.path.basename(path))
             if pp_suffixes:
@@ -756,7 +1037,9 @@ class fortran_file:
 
     def load_from_disk(self) -> tuple[str | None, bool | None]:
         """Read file from disk or update file contents only if they have changed
-        A MD5 hash is used to determine that
+        The modification time and size of the file are checked first, if they
+        differ a BLAKE2b hash of the raw file bytes is used to determine that,
+        the contents are only decoded if the file has changed
 
         Returns
         -------
@@ -766,22 +1049,27 @@ class fortran_file:
         """
         contents: str
         try:
-            if PY3K:
-                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
-                    contents = re.sub(r"\t", r" ", f.read())
-            else:
-                with io.open(self.path, "r", encoding="utf-8", errors="replace") as f:
-                    contents = re.sub(r"\t", r" ", f.read())
+            st = os.stat(self.path)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            # File has not been touched since it was last read
+            if stat_key == self.stat_key and self.hash is not None:
+                return None, False
+            with open(self.path, "rb") as f:
+                contents_bytes = f.read()
         except OSError:
             return "Could not read/decode file", None
         else:
+            self.stat_key = stat_key
             # Check if files are the same
-            hash = hashlib.md5(contents.encode("utf-8")).hexdigest()
+            hash = hashlib.blake2b(contents_bytes, digest_size=16).hexdigest()
             if hash == self.hash:
                 return None, False
 
             self.hash = hash
+            contents = contents_bytes.decode("utf-8", errors="replace")
+            contents = contents.replace("\t", " ")
             self.contents_split = contents.splitlines()
+            self.clear_line_caches()
             self.fixed = detect_fixed_format(self.contents_split)
             self.contents_pp = self.contents_split
             self.nLines = len(self.contents_split)
@@ -796,46 +1084,32 @@ class fortran_file:
             pre_lines, curr_line, _ = self.get_code_line(line_number, forward=False)
             # Skip comment lines
             if self.fixed:
-                if FRegex.FIXED_COMMENT.match(curr_line):
+                if _FIXED_COMMENT_match(curr_line):
                     return False
             else:
-                if FRegex.FREE_COMMENT.match(curr_line):
+                if _FREE_COMMENT_match(curr_line):
                     return False
             # Check for line labels and semicolons
             full_line = "".join(pre_lines) + curr_line
             full_line, line_label = strip_line_label(full_line)
             if line_label is not None:
                 return True
-            line_stripped = strip_strings(full_line, maintain_len=True)
-            if line_stripped.find(";") >= 0:
-                return True
-            # Find trailing comments
-            comm_ind = line_stripped.find("!")
-            if comm_ind >= 0:
-                line_no_comment = full_line[:comm_ind]
-            else:
-                line_no_comment = full_line
-            # Various single line tests
-            if FRegex.END_WORD.match(line_no_comment):
-                return True
-            if FRegex.IMPLICIT.match(line_no_comment):
-                return True
-            if FRegex.CONTAINS.match(line_no_comment):
-                return True
-            # Generic "non-definition" line
-            if FRegex.NON_DEF.match(line_no_comment):
-                return False
-            # Loop through tests
-            for test in def_tests:
-                if test(line_no_comment):
+            # String literals only need stripping if they can hide a `;` or `!`
+            line_no_comment = full_line
+            if (";" in full_line) or ("!" in full_line):
+                line_stripped = strip_strings(full_line, maintain_len=True)
+                if line_stripped.find(";") >= 0:
                     return True
-            return False
+                # Find trailing comments
+                comm_ind = line_stripped.find("!")
+                if comm_ind >= 0:
+                    line_no_comment = full_line[:comm_ind]
+            return statement_requires_reparse(line_no_comment)
 
         self.hash = None
+        self.clear_line_caches()
         text = change.get("text", "")
         change_range = change.get("range")
-        if not PY3K:
-            text = text.encode("utf-8")
         if len(text) == 0:
             text_split = [""]
         else:
@@ -856,7 +1130,8 @@ class fortran_file:
 
         # Check for an edit occurring at the very end of the file
         if start_line == self.nLines:
-            self.set_contents(self.contents_split + text_split)
+            self.contents_split.extend(text_split)
+            self.set_contents(self.contents_split)
             return True
 
         # Check for single line edit
@@ -868,33 +1143,39 @@ class fortran_file:
             self.contents_pp[start_line] = self.contents_split[start_line]
             return check_change_reparse(start_line)
 
-        # Apply standard change to document
-        new_contents = []
-        for i, line in enumerate(self.contents_split):
-            if (i < start_line) or (i > end_line):
-                new_contents.append(line)
-                continue
-
-            if i == start_line:
-                for j, change_line in enumerate(text_split):
-                    if j == 0:
-                        new_contents.append(line[:start_col] + change_line)
-                    else:
-                        new_contents.append(change_line)
-
-            if i == end_line:
-                new_contents[-1] += line[end_col:]
-        self.set_contents(new_contents)
+        # Apply standard change to document, only the edited lines are replaced
+        text_split[0] = self.contents_split[start_line][:start_col] + text_split[0]
+        if end_line < self.nLines:
+            text_split[-1] += self.contents_split[end_line][end_col:]
+        self.contents_split[start_line : end_line + 1] = text_split
+        self.set_contents(self.contents_split)
         return True
 
     def set_contents(self, contents_split: list, detect_format: bool = True):
         """Set file contents"""
         self.contents_split = contents_split
         self.contents_pp = self.contents_split
+        self.clear_line_caches()
         self.nLines = len(self.contents_split)
         if detect_format:
             self.fixed = detect_fixed_format(self.contents_split)
 
+    def clear_line_caches(self):
+        """Clear the cached results derived from the file contents"""
+        self.code_line_cache = {}
+        self.lower_code_line_cache = {}
+        self.fixed_cont_cache = {}
+
+    def is_fixed_cont(self, line_number: int, pp_content: bool = False) -> bool:
+        """Check if line is a fixed format continuation line"""
+        key = (line_number, pp_content)
+        is_cont = self.fixed_cont_cache.get(key)
+        if is_cont is None:
+            line = self.get_line(line_number, pp_content)
+            is_cont = _FIXED_CONT_match(line) is not None
+            self.fixed_cont_cache[key] = is_cont
+        return is_cont
+
     def get_line(self, line_number: int, pp_content: bool = False) -> str:
         """Get single line from file"""
         try:
@@ -914,9 +1195,17 @@ class fortran_file:
         strip_comment: bool = False,
     ) -> tuple[list[str], str, list[str]]:
         """Get full code line from file including any adjacent continuations"""
+        key = (line_number, forward, backward, pp_content, strip_comment)
+        cached = self.code_line_cache.get(key)
+        if cached is not None:
+            # Return new lists, callers are free to modify them
+            return list(cached[0]), cached[1], list(cached[2])
         curr_line = self.get_line(line_number, pp_content)
         if curr_line is None:
             return [], None, []
+        # Bind the lines once, the continuation scans below index them directly
+        src = self.contents_pp if pp_content else self.contents_split
+        nLines = len(src)
         # Search backward for prefix lines
         line_ind = line_number - 1
         pre_lines = []
@@ -924,9 +1213,9 @@ class fortran_file:
             if self.fixed:  # Fixed format file
                 tmp_line = curr_line
                 while line_ind > 0:
-                    if FRegex.FIXED_CONT.match(tmp_line):
+                    if self.is_fixed_cont(line_ind + 1, pp_content):
                         prev_line = tmp_line
-                        tmp_line = self.get_line(line_ind, pp_content)
+                        tmp_line = src[line_ind]
                         if line_ind == line_number - 1:
                             curr_line = " " * 6 + curr_line[6:]
                         else:
@@ -936,27 +1225,27 @@ class fortran_file:
                         break
                     line_ind -= 1
             else:  # Free format file
-                opt_cont_match = FRegex.FREE_CONT.match(curr_line)
+                opt_cont_match = _FREE_CONT_match(curr_line)
                 if opt_cont_match:
                     curr_line = (
                         " " * opt_cont_match.end(0) + curr_line[opt_cont_match.end(0) :]
                     )
                 while line_ind > 0:
-                    tmp_line = strip_strings(
-                        self.get_line(line_ind, pp_content), maintain_len=True
-                    )
-                    tmp_no_comm = tmp_line.split("!")[0]
+                    tmp_line = strip_strings(src[line_ind], maintain_len=True)
+                    tmp_no_comm = tmp_line.partition("!")[0]
                     cont_ind = tmp_no_comm.rfind("&")
-                    opt_cont_match = FRegex.FREE_CONT.match(tmp_no_comm)
+                    opt_cont_match = _FREE_CONT_match(tmp_no_comm)
+                    # Leading continuation characters are blanked out, the
+                    # padded line is only built once it is known to be kept
+                    cont_start = 0
                     if opt_cont_match:
-                        if cont_ind == opt_cont_match.end(0) - 1:
+                        cont_start = opt_cont_match.end(0)
+                        if cont_ind == cont_start - 1:
                             break
-                        tmp_no_comm = (
-                            " " * opt_cont_match.end(0)
-                            + tmp_no_comm[opt_cont_match.end(0) :]
-                        )
                     if cont_ind >= 0:
-                        pre_lines.append(tmp_no_comm[:cont_ind])
+                        pre_lines.append(
+                            " " * cont_start + tmp_no_comm[cont_start:cont_ind]
+                        )
                     else:
                         break
                     line_ind -= 1
@@ -965,21 +1254,17 @@ class fortran_file:
         post_lines = []
         if forward:
             if self.fixed:
-                if line_ind < self.nLines:
-                    next_line = self.get_line(line_ind, pp_content)
+                if line_ind < nLines:
+                    next_line = src[line_ind]
                     line_ind += 1
-                    cont_match = FRegex.FIXED_CONT.match(next_line)
-                    while (cont_match is not None) and (line_ind < self.nLines):
+                    while self.is_fixed_cont(line_ind - 1, pp_content) and (
+                        line_ind < nLines
+                    ):
                         post_lines.append(" " * 6 + next_line[6:])
-                        next_line = self.get_line(line_ind, pp_content)
+                        next_line = src[line_ind]
                         line_ind += 1
-                        cont_match = FRegex.FIXED_CONT.match(next_line)
             else:
-                line_stripped = strip_strings(curr_line, maintain_len=True)
-                iAmper = line_stripped.find("&")
-                iComm = line_stripped.find("!")
-                if iComm < 0:
-                    iComm = iAmper + 1
+                iAmper, iComm = find_free_cont(curr_line)
                 next_line = ""
                 # Read the next line if needed
                 while (iAmper >= 0) and (iAmper < iComm):
@@ -987,45 +1272,42 @@ class fortran_file:
                         curr_line = curr_line[:iAmper]
                     elif next_line != "":
                         post_lines[-1] = next_line[:iAmper]
-                    next_line = self.get_line(line_ind, pp_content)
+                    next_line = src[line_ind] if line_ind < nLines else None
                     line_ind += 1
                     # Skip any preprocessor statements when seeking the next line
-                    if FRegex.PP_ANY.match(next_line):
+                    if _PP_ANY_match(next_line):
                         next_line = ""
                         post_lines.append("")
                         continue
                     # Skip empty or comment lines
-                    match = FRegex.FREE_COMMENT.match(next_line)
+                    match = _FREE_COMMENT_match(next_line)
                     if next_line.rstrip() == "" or match:
                         next_line = ""
                         post_lines.append("")
                         continue
-                    opt_cont_match = FRegex.FREE_CONT.match(next_line)
+                    opt_cont_match = _FREE_CONT_match(next_line)
                     if opt_cont_match:
                         next_line = (
                             " " * opt_cont_match.end(0)
                             + next_line[opt_cont_match.end(0) :]
                         )
                     post_lines.append(next_line)
-                    line_stripped = strip_strings(next_line, maintain_len=True)
-                    iAmper = line_stripped.find("&")
-                    iComm = line_stripped.find("!")
-                    if iComm < 0:
-                        iComm = iAmper + 1
+                    iAmper, iComm = find_free_cont(next_line)
         # Detect start of comment in current line
         if strip_comment:
             curr_line = self.strip_comment(curr_line)
         pre_lines.reverse()
+        self.code_line_cache[key] = (tuple(pre_lines), curr_line, tuple(post_lines))
         return pre_lines, curr_line, post_lines
 
     def strip_comment(self, line: str) -> str:
         """Strip comment from line"""
         if self.fixed:
-            if FRegex.FIXED_COMMENT.match(line) and FRegex.FIXED_OPENMP.match(line):
+            if _FIXED_COMMENT_match(line) and _FIXED_OPENMP_match(line):
                 return ""
         else:
-            if FRegex.FREE_OPENMP.match(line) is None:
-                line = line.split("!")[0]
+            if _FREE_OPENMP_match(line) is None:
+                line = line.partition("!")[0]
         return line
 
     def find_word_in_code_line(
@@ -1036,23 +1318,34 @@ class fortran_file:
         backward: bool = False,
         pp_content: bool = False,
     ) -> tuple[int, int, int]:
-        back_lines, curr_line, forward_lines = self.get_code_line(
-            line_number, forward=forward, backward=backward, pp_content=pp_content
-        )
+        # The same lines are searched for every reference of a symbol, so keep
+        # their lowercase versions, with the preceding lines nearest first
+        key = (line_number, forward, backward, pp_content)
+        lower_lines = self.lower_code_line_cache.get(key)
+        if lower_lines is None:
+            back_lines, curr_line, forward_lines = self.get_code_line(
+                line_number, forward=forward, backward=backward, pp_content=pp_content
+            )
+            lower_lines = (
+                [line.lower() for line in reversed(back_lines)],
+                curr_line.lower() if curr_line is not None else None,
+                [line.lower() for line in forward_lines],
+            )
+            self.lower_code_line_cache[key] = lower_lines
+        back_lines, curr_line, forward_lines = lower_lines
         i0 = i1 = -1
+        find_word_lower = word.lower()
         if curr_line is not None:
-            find_word_lower = word.lower()
-            i0, i1 = find_word_in_line(curr_line.lower(), find_word_lower)
+            i0, i1 = find_word_in_line(curr_line, find_word_lower)
         if backward and (i0 < 0):
-            back_lines.reverse()
             for (i, line) in enumerate(back_lines):
-                i0, i1 = find_word_in_line(line.lower(), find_word_lower)
+                i0, i1 = find_word_in_line(line, find_word_lower)
                 if i0 >= 0:
                     line_number -= i + 1
                     return line_number, i0, i1
         if forward and (i0 < 0):
             for (i, line) in enumerate(forward_lines):
-                i0, i1 = find_word_in_line(line.lower(), find_word_lower)
+                i0, i1 = find_word_in_line(line, find_word_lower)
                 if i0 >= 0:
                     line_number += i + 1
                     return line_number, i0, i1
@@ -1073,6 +1366,7 @@ class fortran_file:
             include_dirs=include_dirs,
             debug=debug,
         )
+        self.clear_line_caches()
         return pp_skips, pp_defines
 
     def check_file(self, obj_tree, max_line_length=-1, max_comment_line_length=-1):
@@ -1085,11 +1379,18 @@ class fortran_file:
             )
 
             if self.fixed:
-                COMMENT_LINE_MATCH = FRegex.FIXED_COMMENT
+                comment_line_match = _FIXED_COMMENT_match
             else:
-                COMMENT_LINE_MATCH = FRegex.FREE_COMMENT
+                comment_line_match = _FREE_COMMENT_match
+            # Lines shorter than both limits cannot be reported, so only lines
+            # longer than the smallest limit need to be tested for comments
+            min_length = min(
+                n for n in (max_line_length, max_comment_line_length) if n > 0
+            )
             for (i, line) in enumerate(self.contents_split):
-                if COMMENT_LINE_MATCH.match(line) is None:
+                if len(line) <= min_length:
+                    continue
+                if comment_line_match(line) is None:
                     if (max_line_length > 0) and (len(line) > max_line_length):
                         diagnostics.append(
                             {
@@ -1125,6 +1426,160 @@ class fortran_file:
         return diagnostics
 
 
+def _c_div(lhs: int, rhs: int) -> int:
+    """Integer division truncating towards zero, as in C"""
+    quotient = abs(lhs) // abs(rhs)
+    return quotient if (lhs < 0) == (rhs < 0) else -quotient
+
+
+# Binding power and evaluation of the binary operators allowed in
+# preprocessor #if expressions, following the C operator precedence.
+# `&&` and `||` are short-circuited in `eval_pp_expr` instead
+PP_BINARY_OPS = {
+    "||": (1, None),
+    "&&": (2, None),
+    "|": (3, lambda a, b: a | b),
+    "^": (4, lambda a, b: a ^ b),
+    "&": (5, lambda a, b: a & b),
+    "==": (6, lambda a, b: int(a == b)),
+    "!=": (6, lambda a, b: int(a != b)),
+    "<": (7, lambda a, b: int(a < b)),
+    ">": (7, lambda a, b: int(a > b)),
+    "<=": (7, lambda a, b: int(a <= b)),
+    ">=": (7, lambda a, b: int(a >= b)),
+    "<<": (8, lambda a, b: a << b),
+    ">>": (8, lambda a, b: a >> b),
+    "+": (9, lambda a, b: a + b),
+    "-": (9, lambda a, b: a - b),
+    "*": (10, lambda a, b: a * b),
+    "/": (10, _c_div),
+    "%": (10, lambda a, b: a - b * _c_div(a, b)),
+}
+PP_UNARY_OPS = {
+    "!": lambda a: int(not a),
+    "-": lambda a: -a,
+    "+": lambda a: a,
+    "~": lambda a: ~a,
+}
+_PP_UNARY_BP = 11
+
+
+def _parse_pp_literal(token: str) -> int:
+    if token == "True":
+        return 1
+    if token == "False":
+        return 0
+    token = token.rstrip("uUlL")
+    if token[:2].lower() == "0x":
+        return int(token, 16)
+    if token.isdigit():
+        return int(token, 8) if token[0] == "0" else int(token)
+    raise ValueError(f"Invalid token in preprocessor expression: {token}")
+
+
+def _parse_pp_tokens(tokens: list[str], pos: int, min_bp: int) -> tuple[Any, int]:
+    """Parse tokens (Pratt parser) into a tree of nested tuples
+    `(op, operand)`/`(op, lhs, rhs)`, with integers as the leaves"""
+    if pos >= len(tokens):
+        raise ValueError("Unexpected end of preprocessor expression")
+    token = tokens[pos]
+    pos += 1
+    if token == "(":
+        lhs, pos = _parse_pp_tokens(tokens, pos, 0)
+        if pos >= len(tokens) or tokens[pos] != ")":
+            raise ValueError("Unbalanced parentheses in preprocessor expression")
+        pos += 1
+    elif token in PP_UNARY_OPS:
+        operand, pos = _parse_pp_tokens(tokens, pos, _PP_UNARY_BP)
+        lhs = (token, operand)
+    else:
+        lhs = _parse_pp_literal(token)
+    while pos < len(tokens):
+        op = tokens[pos]
+        if op not in PP_BINARY_OPS:
+            break
+        bp = PP_BINARY_OPS[op][0]
+        # Equal binding power ends the loop, making operators left associative
+        if bp <= min_bp:
+            break
+        rhs, pos = _parse_pp_tokens(tokens, pos + 1, bp)
+        lhs = (op, lhs, rhs)
+    return lhs, pos
+
+
+@lru_cache(maxsize=256)
+def parse_pp_expr(expr: str) -> Any:
+    """Parse a preprocessor #if expression, with its macros already replaced
+
+    Raises
+    ------
+    ValueError
+        If the expression is not a valid constant integer expression
+    """
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = _PP_EXPR_TOKEN_match(expr, pos)
+        if match is None:
+            raise ValueError(f"Invalid preprocessor expression: {expr}")
+        tokens.append(match.group(1))
+        pos = match.end(0)
+    tree, pos = _parse_pp_tokens(tokens, 0, 0)
+    if pos != len(tokens):
+        raise ValueError(f"Invalid preprocessor expression: {expr}")
+    return tree
+
+
+def eval_pp_expr(tree: Any) -> int:
+    """Evaluate a tree returned by `parse_pp_expr`"""
+    if isinstance(tree, int):
+        return tree
+    if len(tree) == 2:
+        return PP_UNARY_OPS[tree[0]](eval_pp_expr(tree[1]))
+    op, lhs, rhs = tree
+    if op == "&&":
+        return int(bool(eval_pp_expr(lhs)) and bool(eval_pp_expr(rhs)))
+    if op == "||":
+        return int(bool(eval_pp_expr(lhs)) or bool(eval_pp_expr(rhs)))
+    return PP_BINARY_OPS[op][1](eval_pp_expr(lhs), eval_pp_expr(rhs))
+
+
+def find_include_file(include_filename: str, include_dirs) -> str | None:
+    """Find the first include directory containing an include file
+
+    Parameters
+    ----------
+    include_filename : str
+        File name as it appears in the include statement
+    include_dirs : Iterable[str]
+        Directories to search, in order
+
+    Returns
+    -------
+    str | None
+        Absolute path to the include file, None if it could not be found
+    """
+    # Intentionally keep this as a list and not a set. There are cases
+    # where projects play tricks with the include order of their headers
+    # to get their codes to compile. Using a set would not permit that.
+    # For the same reason found paths are not cached, a header created in an
+    # earlier directory must take precedence as soon as it exists.
+    for include_dir in include_dirs:
+        include_path_tmp = os.path.join(include_dir, include_filename)
+        if os.path.isfile(include_path_tmp):
+            return os.path.abspath(include_path_tmp)
+    return None
+
+
+@lru_cache(maxsize=128)
+def get_include_file(include_path: str) -> fortran_file:
+    """File object of an include file, shared by all files including it so the
+    file is only read again from disk when it has been modified, see
+    `fortran_file.load_from_disk`"""
+    return fortran_file(include_path)
+
+
 def preprocess_file(
     contents_split: list,
     file_path: str = None,
@@ -1137,18 +1592,10 @@ def preprocess_file(
     # For "if" statements all blocks are excluded except the "else" block if present
     # For "ifndef" statements all blocks excluding the first block are excluded
     def eval_pp_if(text, defs: dict = None):
-        def replace_ops(expr: str):
-            expr = expr.replace("&&", " and ")
-            expr = expr.replace("||", " or ")
-            expr = expr.replace("!=", " <> ")
-            expr = expr.replace("!", " not ")
-            expr = expr.replace(" <> ", " != ")
-            return expr
-
         def replace_defined(line: str):
             i0 = 0
             out_line = ""
-            for match in FRegex.DEFINED.finditer(line):
+            for match in _DEFINED_finditer(line):
                 if match.group(1) in defs:
                     out_line += line[i0 : match.start(0)] + "($@)"
                 else:
@@ -1161,7 +1608,10 @@ def preprocess_file(
         def replace_vars(line: str):
             i0 = 0
             out_line = ""
-            for match in FRegex.WORD.finditer(line):
+            for match in _WORD_finditer(line):
+                # Skip the digits and suffixes of numbers e.g. 0x1F, 1L
+                if match.start(0) > 0 and line[match.start(0) - 1].isalnum():
+                    continue
                 if match.group(0) in defs:
                     out_line += line[i0 : match.start(0)] + defs[match.group(0)]
                 else:
@@ -1178,16 +1628,18 @@ def preprocess_file(
         out_line = replace_defined(text)
         out_line = replace_vars(out_line)
         try:
-            line_res = eval(replace_ops(out_line))
-        except:
+            line_res = eval_pp_expr(parse_pp_expr(out_line))
+        except (ValueError, ZeroDivisionError, RecursionError):
             return False
         else:
-            return line_res
+            return line_res != 0
 
     if pp_defs is None:
         pp_defs = {}
     if include_dirs is None:
         include_dirs = set()
+    # Avoid formatting the per-line debug messages if they are not logged
+    debug_log: bool = log.isEnabledFor(logging.DEBUG)
     if file_path is not None:
         include_dirs.add(os.path.abspath(os.path.dirname(file_path)))
     pp_skips = []
@@ -1195,20 +1647,27 @@ def preprocess_file(
     pp_stack = []
     defs_tmp = pp_defs.copy()
     def_regexes = {}
+    # Matches any of the macro names, reset when the defined names change
+    defs_regex = None
+    def_names: list[str] = []
+    def_index: dict[str, int] = {}
+    defs_words = False
     output_file = []
     def_cont_name = None
     for (i, line) in enumerate(contents_split):
         # Handle multiline macro continuation
         if def_cont_name is not None:
             output_file.append("")
-            if line.rstrip()[-1] != "\\":
+            if not line.rstrip().endswith("\\"):
                 defs_tmp[def_cont_name] += line.strip()
                 def_cont_name = None
             else:
                 defs_tmp[def_cont_name] += line[0:-1].strip()
             continue
+        # Directives must start the line, saves matching them on every code line
+        is_directive = line.startswith("#")
         # Handle conditional statements
-        match = FRegex.PP_REGEX.match(line)
+        match = _PP_REGEX_match(line) if is_directive else None
         if match:
             output_file.append(line)
             def_name = None
@@ -1228,10 +1687,12 @@ def preprocess_file(
             if if_start:
                 if is_path:
                     pp_stack.append([-1, -1])
-                    log.debug(f"{line.strip()} !!! Conditional TRUE({i+1})")
+                    if debug_log:
+                        log.debug(f"{line.strip()} !!! Conditional TRUE({i+1})")
                 else:
                     pp_stack.append([i + 1, -1])
-                    log.debug(f"{line.strip()} !!! Conditional FALSE({i+1})")
+                    if debug_log:
+                        log.debug(f"{line.strip()} !!! Conditional FALSE({i+1})")
                 continue
             if len(pp_stack) == 0:
                 continue
@@ -1260,7 +1721,8 @@ def preprocess_file(
                     continue
                 if pp_stack[-1][1] < 0:
                     pp_stack[-1][1] = i + 1
-                    log.debug(f"{line.strip()} !!! Conditional FALSE/END({i+1})")
+                    if debug_log:
+                        log.debug(f"{line.strip()} !!! Conditional FALSE/END({i+1})")
                 pp_skips.append(pp_stack.pop())
             if debug:
                 if inc_start:
@@ -1269,11 +1731,11 @@ def preprocess_file(
                     log.debug(f"{line.strip()} !!! Conditional FALSE({i+1})")
             continue
         # Handle variable/macro definitions files
-        match = FRegex.PP_DEF.match(line)
+        match = _PP_DEF_match(line) if is_directive else None
         if (match is not None) and ((len(pp_stack) == 0) or (pp_stack[-1][0] < 0)):
             output_file.append(line)
             pp_defines.append(i + 1)
-            def_name = match.group(2)
+            def_name = sys.intern(match.group(2))
             # If this is an argument list of a function add them to the name
             # get_definition will only return the function name upon hover
             # hence if the argument list is appended in the def_name then
@@ -1286,7 +1748,7 @@ def preprocess_file(
                 eq_ind = line[match.end(0) :].find(" ")
                 if eq_ind >= 0:
                     # Handle multiline macros
-                    if line.rstrip()[-1] == "\\":
+                    if line.rstrip().endswith("\\"):
                         defs_tmp[def_name] = line[match.end(0) + eq_ind : -1].strip()
                         def_cont_name = def_name
                     else:
@@ -1295,25 +1757,20 @@ def preprocess_file(
                     defs_tmp[def_name] = "True"
             elif (match.group(1) == "undef") and (def_name in defs_tmp):
                 defs_tmp.pop(def_name, None)
-            log.debug(f"{line.strip()} !!! Define statement({i+1})")
+            defs_regex = None
+            if debug_log:
+                log.debug(f"{line.strip()} !!! Define statement({i+1})")
             continue
         # Handle include files
-        match = FRegex.PP_INCLUDE.match(line)
+        match = _PP_INCLUDE_match(line) if is_directive else None
         if (match is not None) and ((len(pp_stack) == 0) or (pp_stack[-1][0] < 0)):
-            log.debug(f"{line.strip()} !!! Include statement({i+1})")
+            if debug_log:
+                log.debug(f"{line.strip()} !!! Include statement({i+1})")
             include_filename = match.group(1).replace('"', "")
-            include_path = None
-            # Intentionally keep this as a list and not a set. There are cases
-            # where projects play tricks with the include order of their headers
-            # to get their codes to compile. Using a set would not permit that.
-            for include_dir in include_dirs:
-                include_path_tmp = os.path.join(include_dir, include_filename)
-                if os.path.isfile(include_path_tmp):
-                    include_path = os.path.abspath(include_path_tmp)
-                    break
+            include_path = find_include_file(include_filename, include_dirs)
             if include_path is not None:
                 try:
-                    include_file = fortran_file(include_path)
+                    include_file = get_include_file(include_path)
                     err_string, _ = include_file.load_from_disk()
                     if err_string is None:
                         log.debug(f'\n!!! Parsing include file "{include_path}"')
@@ -1324,6 +1781,7 @@ def preprocess_file(
                             include_dirs=include_dirs,
                             debug=debug,
                         )
+                        defs_regex = None
                         log.debug("!!! Completed parsing include file\n")
 
                     else:
@@ -1333,22 +1791,68 @@ def preprocess_file(
                     log.debug("!!! Failed to parse include file: exception")
 
             else:
-                log.debug(f"{line.strip()} !!! Could not locate include file ({i+1})")
+                if debug_log:
+                    log.debug(
+                        f"{line.strip()} !!! Could not locate include file ({i+1})"
+                    )
 
         # Substitute (if any) read in preprocessor macros
-        for def_tmp, value in defs_tmp.items():
+        if not defs_tmp:
+            output_file.append(line)
+            continue
+        if defs_regex is None:
+            defs_regex = re.compile("|".join(rf"(?:\b{d}\b)" for d in defs_tmp))
+            def_names = list(defs_tmp)
+            def_index = {d: n for n, d in enumerate(def_names)}
+            # Matches can only be mapped back to macros with plain word names
+            defs_words = all(re.fullmatch(r"\w+", d) for d in def_names)
+        # Substitutions only happen if a macro name is present in the line
+        if defs_regex.search(line) is None:
+            output_file.append(line)
+            continue
+        # Macros are substituted in order of definition, each one on the result
+        # of the previous substitutions. Only the macros present in the line, or
+        # introduced into it by an earlier substitution, need to be tried
+        if defs_words:
+            candidates = [def_index[m.group(0)] for m in defs_regex.finditer(line)]
+            heapq.heapify(candidates)
+        else:
+            candidates = list(range(len(def_names)))
+        last_ind = -1
+        while candidates:
+            def_ind = heapq.heappop(candidates)
+            if def_ind <= last_ind:
+                continue
+            last_ind = def_ind
+            def_tmp = def_names[def_ind]
+            value = defs_tmp[def_tmp]
             def_regex = def_regexes.get(def_tmp)
             if def_regex is None:
                 def_regex = re.compile(rf"\b{def_tmp}\b")
                 def_regexes[def_tmp] = def_regex
             line_new, nsubs = def_regex.subn(value, line)
             if nsubs > 0:
-                log.debug(f"{line.strip()} !!! Macro sub({i+1}) '{def_tmp}' -> {value}")
+                if debug_log:
+                    log.debug(
+                        f"{line.strip()} !!! Macro sub({i+1}) '{def_tmp}' -> {value}"
+                    )
                 line = line_new
+                if defs_words:
+                    for m in defs_regex.finditer(line):
+                        new_ind = def_index[m.group(0)]
+                        if new_ind > def_ind:
+                            heapq.heappush(candidates, new_ind)
         output_file.append(line)
     return output_file, pp_skips, pp_defines, defs_tmp
 
 
+@lru_cache(maxsize=1024)
+def _scope_name(prefix: str, counter: int) -> str:
+    """Name of an unnamed scope e.g. `#DO1`, every file uses the same ones so
+    they are shared between the ASTs"""
+    return f"{prefix}{counter}"
+
+
 def process_file(
     file_obj: fortran_file,
     debug: bool = False,
@@ -1358,7 +1862,8 @@ def process_file(
     """Build file AST by parsing file"""
 
     def parser_debug_msg(msg: str, line: str, ln: int):
-        log.debug(f"{line.strip()} !!! {msg} statement({ln})")
+        if debug_log:
+            log.debug(f"{line.strip()} !!! {msg} statement({ln})")
 
     if pp_defs is None:
         pp_defs = {}
@@ -1369,6 +1874,8 @@ def process_file(
         logging.basicConfig(
             level=logging.DEBUG, stream=sys.stdout, format="%(message)s"
         )
+    # Avoid formatting the per-line debug messages if they are not logged
+    debug_log: bool = log.isEnabledFor(logging.DEBUG)
 
     file_ast = fortran_ast(file_obj)
     if file_obj.preproc:
@@ -1384,6 +1891,19 @@ def process_file(
         log.debug("=== No PreProc ===\n")
         pp_skips = []
         pp_defines = []
+    # Merge the skipped regions, which can be nested, into sorted disjoint
+    # intervals so that each line only requires a binary search
+    pp_skip_starts: list[int] = []
+    pp_skip_ends: list[int] = []
+    for (skip_start, skip_end) in sorted(pp_skips):
+        if skip_start > skip_end:
+            continue
+        if pp_skip_ends and (skip_start <= pp_skip_ends[-1] + 1):
+            pp_skip_ends[-1] = max(pp_skip_ends[-1], skip_end)
+        else:
+            pp_skip_starts.append(skip_start)
+            pp_skip_ends.append(skip_end)
+    pp_defines = set(pp_defines)
     #
     line_ind = 0
     next_line_ind = 0
@@ -1394,19 +1914,21 @@ def process_file(
     if_counter = 0
     select_counter = 0
     block_id_stack = []
-    semi_split = []
+    semi_split: deque[str] = deque()
     doc_string: str = None
+    # Statements none of the definition tests matched, the tests only depend on
+    # the statement itself so repeated ones e.g. `return` are not tested again
+    no_def_lines: set[str] = set()
     if file_obj.fixed:
-        COMMENT_LINE_MATCH = FRegex.FIXED_COMMENT
-        DOC_COMMENT_MATCH = FRegex.FIXED_DOC
+        comment_line_match = _FIXED_COMMENT_match
+        doc_comment_match = _FIXED_DOC_match
     else:
-        COMMENT_LINE_MATCH = FRegex.FREE_COMMENT
-        DOC_COMMENT_MATCH = FRegex.FREE_DOC
+        comment_line_match = _FREE_COMMENT_match
+        doc_comment_match = _FREE_DOC_match
     while (next_line_ind < file_obj.nLines) or (len(semi_split) > 0):
         # Get next line
         if len(semi_split) > 0:
-            line = semi_split[0]
-            semi_split = semi_split[1:]
+            line = semi_split.popleft()
             get_full = False
         else:
             line_ind = next_line_ind
@@ -1417,10 +1939,10 @@ def process_file(
         if line == "":
             continue  # Skip empty lines
         # Skip comment lines
-        match = COMMENT_LINE_MATCH.match(line)
+        match = comment_line_match(line)
         if match:
             # Check for documentation
-            doc_match = DOC_COMMENT_MATCH.match(line)
+            doc_match = doc_comment_match(line)
             if doc_match:
                 doc_lines = [line[doc_match.end(0) :].strip()]
                 if doc_match.group(1) == ">":
@@ -1433,12 +1955,12 @@ def process_file(
                 if next_line_ind < file_obj.nLines:
                     next_line = file_obj.get_line(next_line_ind, pp_content=True)
                     next_line_ind += 1
-                    doc_match = DOC_COMMENT_MATCH.match(next_line)
+                    doc_match = doc_comment_match(next_line)
                     while (doc_match is not None) and (next_line_ind < file_obj.nLines):
                         doc_lines.append(next_line[doc_match.end(0) :].strip())
                         next_line = file_obj.get_line(next_line_ind, pp_content=True)
                         next_line_ind += 1
-                        doc_match = DOC_COMMENT_MATCH.match(next_line)
+                        doc_match = doc_comment_match(next_line)
                     next_line_ind -= 1
                 if debug:
                     for (i, doc_line) in enumerate(doc_lines):
@@ -1454,30 +1976,33 @@ def process_file(
         # Handle trailing doc strings
         if doc_string:
             file_ast.add_doc("!! " + doc_string)
-            log.debug(f"{doc_string} !!! Doc string({line_number})")
+            if debug_log:
+                log.debug(f"{doc_string} !!! Doc string({line_number})")
             doc_string = None
         # Handle preprocessing regions
-        do_skip = False
-        for pp_reg in pp_skips:
-            if (line_number >= pp_reg[0]) and (line_number <= pp_reg[1]):
-                do_skip = True
-                break
+        skip_ind = bisect_right(pp_skip_starts, line_number) - 1
+        if (skip_ind >= 0) and (line_number <= pp_skip_ends[skip_ind]):
+            continue
         if line_number in pp_defines:
-            do_skip = True
-        if do_skip:
             continue
         # Get full line
         if get_full:
             _, line, post_lines = file_obj.get_code_line(
                 line_ind, backward=False, pp_content=True
             )
-            next_line_ind += len(post_lines)
-            line = "".join([line] + post_lines)
+            if post_lines:
+                next_line_ind += len(post_lines)
+                line += "".join(post_lines)
         # print(line)
         line, line_label = strip_line_label(line)
-        line_stripped = strip_strings(line, maintain_len=True)
-        # Find trailing comments
-        comm_ind = line_stripped.find("!")
+        # String literals only need stripping if they can hide a `;` or `!`
+        if (";" in line) or ("!" in line):
+            line_stripped = strip_strings(line, maintain_len=True)
+            # Find trailing comments
+            comm_ind = line_stripped.find("!")
+        else:
+            line_stripped = line
+            comm_ind = -1
         if comm_ind >= 0:
             line_no_comment = line[:comm_ind]
             line_post_comment = line[comm_ind:]
@@ -1486,30 +2011,26 @@ def process_file(
             line_no_comment = line
             line_post_comment = None
         # Split lines with semicolons
-        semi_colon_ind = line_stripped.find(";")
+        semi_colon_ind = line_stripped.find(";") if (";" in line) else -1
         if semi_colon_ind > 0:
-            semi_inds = []
-            tmp_line = line_stripped
-            while semi_colon_ind >= 0:
-                semi_inds.append(semi_colon_ind)
-                tmp_line = tmp_line[semi_colon_ind + 1 :]
-                semi_colon_ind = tmp_line.find(";")
+            # Split the line on every semicolon outside of string literals
             i0 = 0
-            for semi_colon_ind in semi_inds:
-                semi_split.append(line[i0 : i0 + semi_colon_ind])
-                i0 += semi_colon_ind + 1
+            while semi_colon_ind >= 0:
+                semi_split.append(line[i0:semi_colon_ind])
+                i0 = semi_colon_ind + 1
+                semi_colon_ind = line_stripped.find(";", i0)
             if len(semi_split) > 0:
                 semi_split.append(line[i0:])
-                line = semi_split[0]
-                semi_split = semi_split[1:]
-                line_stripped = strip_strings(line, maintain_len=True)
+                line = semi_split.popleft()
                 line_no_comment = line
                 line_post_comment = None
+        stmt_match = _STMT_CLASS_match(line_no_comment)
+        stmt_class = None if stmt_match is None else stmt_match.lastgroup
         # Test for scope end
         if file_ast.END_SCOPE_REGEX is not None:
-            match = FRegex.END_WORD.match(line_no_comment)
             # Handle end statement
-            if match:
+            if stmt_class == "end":
+                match = _END_WORD_match(line_no_comment)
                 end_scope_word = None
                 if match.group(1) is None:
                     end_scope_word = ""
@@ -1531,10 +2052,11 @@ def process_file(
                     ):
                         file_ast.end_scope(line_number)
                     file_ast.end_scope(line_number)
-                    log.debug(
-                        f'{line.strip()} !!! END "{end_scope_word}"'
-                        f" scope({line_number})"
-                    )
+                    if debug_log:
+                        log.debug(
+                            f'{line.strip()} !!! END "{end_scope_word}"'
+                            f" scope({line_number})"
+                        )
                     continue
             # Look for old-style end of DO loops with line labels
             if (file_ast.current_scope.get_type() == DO_TYPE_ID) and (
@@ -1545,16 +2067,16 @@ def process_file(
                     file_ast.end_scope(line_number)
                     block_id_stack.pop()
                     did_close = True
-                    log.debug(f'{line.strip()} !!! END "DO" scope({line_number})')
+                    if debug_log:
+                        log.debug(f'{line.strip()} !!! END "DO" scope({line_number})')
                 if did_close:
                     continue
         # Skip if known generic code line
-        match = FRegex.NON_DEF.match(line_no_comment)
-        if match:
+        if stmt_class == "non_def":
             continue
         # Mark implicit statement
-        match = FRegex.IMPLICIT.match(line_no_comment)
-        if match:
+        if stmt_class == "implicit":
+            match = _IMPLICIT_match(line_no_comment)
             err_message = None
             if file_ast.current_scope is None:
                 err_message = "IMPLICIT statement without enclosing scope"
@@ -1576,8 +2098,8 @@ def process_file(
             parser_debug_msg("IMPLICIT", line, line_number)
             continue
         # Mark contains statement
-        match = FRegex.CONTAINS.match(line_no_comment)
-        if match:
+        if stmt_class == "contains":
+            match = _CONTAINS_match(line_no_comment)
             err_message = None
             try:
                 if file_ast.current_scope is None:
@@ -1600,17 +2122,20 @@ def process_file(
             continue
         # Look for trailing doc string
         if line_post_comment:
-            doc_match = FRegex.FREE_DOC.match(line_post_comment)
+            doc_match = _FREE_DOC_match(line_post_comment)
             if doc_match:
                 doc_string = line_post_comment[doc_match.end(0) :].strip()
+        if line_no_comment in no_def_lines:
+            continue
         # Loop through tests
         obj_read = None
-        for test in def_tests:
+        for test in get_def_tests(line_no_comment):
             obj_read = test(line_no_comment)
             if obj_read is not None:
                 break
         # Move to next line if nothing in the definition tests matches
         if obj_read is None:
+            no_def_lines.add(line_no_comment)
             continue
 
         obj_type = obj_read[0]
@@ -1623,36 +2148,41 @@ def process_file(
             procedure_def = False
             if desc_string[:3] == "PRO":
                 if file_ast.current_scope.get_type() == INTERFACE_TYPE_ID:
-                    for var_name in obj_info.var_names:
-                        file_ast.add_int_member(var_name)
+                    file_ast.add_int_members(obj_info.var_names)
                     parser_debug_msg("INTERFACE-PRO", line, line_number)
                     continue
                 procedure_def = True
                 link_name = get_paren_substring(desc_string)
             for var_name in obj_info.var_names:
                 link_name: str = None
-                if var_name.find("=>") > -1:
-                    name_split = var_name.split("=>")
-                    name_raw = name_split[0]
-                    link_name = name_split[1].split("(")[0].strip()
+                # Split off pointer associations `=>` or initialisations `=`
+                name_raw, is_link, link_tmp = var_name.partition("=>")
+                if is_link:
+                    link_name = link_tmp.partition("=>")[0].partition("(")[0].strip()
                     if link_name.lower() == "null":
                         link_name = None
                 else:
-                    name_raw = var_name.split("=")[0]
-                # Add dimension if specified
-                key_tmp = obj_info.keywords[:]
+                    name_raw = name_raw.partition("=")[0]
+                # Add dimension if specified, the keywords are only copied then
+                key_tmp = obj_info.keywords
                 iparen = name_raw.find("(")
                 if iparen == 0:
                     continue
                 elif iparen > 0:
+                    # Same as get_paren_substring(name_raw), reusing `iparen`
+                    iparen_end = name_raw.rfind(")")
+                    paren_str = None
+                    if iparen < iparen_end:
+                        paren_str = name_raw[iparen + 1 : iparen_end]
                     if name_raw[iparen - 1] == "*":
                         iparen -= 1
                         if desc_string.find("(") < 0:
-                            desc_string += f"*({get_paren_substring(name_raw)})"
+                            desc_string = sys.intern(f"{desc_string}*({paren_str})")
                     else:
-                        key_tmp.append(f"dimension({get_paren_substring(name_raw)})")
+                        key_tmp = key_tmp + [f"dimension({paren_str})"]
                     name_raw = name_raw[:iparen]
-                name_stripped = name_raw.strip()
+                # The same names are declared in many scopes and files
+                name_stripped = sys.intern(name_raw.strip())
                 keywords, keyword_info = map_keywords(key_tmp)
                 if procedure_def:
                     new_var = fortran_meth(
@@ -1678,13 +2208,17 @@ def process_file(
                     #  the value in hover
                     if new_var.is_parameter():
                         _, col = find_word_in_line(line, name_stripped)
-                        match = FRegex.PARAMETER_VAL.match(line[col:])
+                        match = _PARAMETER_VAL_match(line, col)
                         if match:
                             var = match.group(1).strip()
                             new_var.set_parameter_val(var)
 
-                    # Check if the "variable" is external and if so cycle
-                    if find_external(file_ast, desc_string, name_stripped, new_var):
+                    # Check if the "variable" is external and if so cycle, only
+                    # possible for EXTERNALs or names previously declared EXTERNAL
+                    if (
+                        (name_stripped in file_ast.externals_by_name)
+                        or (desc_string.upper() == "EXTERNAL")
+                    ) and find_external(file_ast, desc_string, name_stripped, new_var):
                         continue
 
                 # if not merge_external:
@@ -1723,6 +2257,7 @@ def process_file(
 
         elif obj_type == "fun":
             keywords, _ = map_keywords(obj_info.keywords)
+            result = obj_info.result
             new_fun = fortran_function(
                 file_ast,
                 line_number,
@@ -1730,19 +2265,19 @@ def process_file(
                 args=obj_info.args,
                 mod_flag=obj_info.mod_flag,
                 keywords=keywords,
-                result_type=obj_info.result.type,
-                result_name=obj_info.result.name,
+                result_type=result.type,
+                result_name=result.name,
             )
             file_ast.add_scope(new_fun, FRegex.END_FUN)
             # function type is present without result(), register the automatic
             # result() variable that is the function name
-            if obj_info.result.type:
-                keywords, keyword_info = map_keywords(obj_info.result.keywords)
+            if result.type:
+                keywords, keyword_info = map_keywords(result.keywords)
                 new_obj = fortran_var(
                     file_ast,
                     line_number,
-                    name=obj_info.result.name,
-                    var_desc=obj_info.result.type,
+                    name=result.name,
+                    var_desc=result.type,
                     keywords=keywords,
                     keyword_info=keyword_info,
                 )
@@ -1753,14 +2288,14 @@ def process_file(
             name = obj_info
             if name is None:
                 block_counter += 1
-                name = f"#BLOCK{block_counter}"
+                name = _scope_name("#BLOCK", block_counter)
             new_block = fortran_block(file_ast, line_number, name)
             file_ast.add_scope(new_block, FRegex.END_BLOCK, req_container=True)
             parser_debug_msg("BLOCK", line, line_number)
 
         elif obj_type == "do":
             do_counter += 1
-            name = f"#DO{do_counter}"
+            name = _scope_name("#DO", do_counter)
             if obj_info != "":
                 block_id_stack.append(obj_info)
             new_do = fortran_do(file_ast, line_number, name)
@@ -1771,21 +2306,22 @@ def process_file(
             # Add block if WHERE is not single line
             if not obj_info:
                 do_counter += 1
-                name = f"#WHERE{do_counter}"
+                name = _scope_name("#WHERE", do_counter)
                 new_do = fortran_where(file_ast, line_number, name)
                 file_ast.add_scope(new_do, FRegex.END_WHERE, req_container=True)
             parser_debug_msg("WHERE", line, line_number)
 
         elif obj_type == "assoc":
             block_counter += 1
-            name = f"#ASSOC{block_counter}"
+            name = _scope_name("#ASSOC", block_counter)
             new_assoc = fortran_associate(file_ast, line_number, name)
             file_ast.add_scope(new_assoc, FRegex.END_ASSOCIATE, req_container=True)
             for bound_var in obj_info:
-                binding_split = bound_var.split("=>")
-                if len(binding_split) == 2:
-                    binding_name = binding_split[0].strip()
-                    link_name = binding_split[1].strip()
+                binding_name, is_binding, link_name = bound_var.partition("=>")
+                # Skip malformed bindings with more than one `=>`
+                if is_binding and ("=>" not in link_name):
+                    binding_name = binding_name.strip()
+                    link_name = link_name.strip()
                     file_ast.add_variable(
                         new_assoc.create_binding_variable(
                             file_ast, line_number, binding_name, link_name
@@ -1795,14 +2331,14 @@ def process_file(
 
         elif obj_type == "if":
             if_counter += 1
-            name = f"#IF{if_counter}"
+            name = _scope_name("#IF", if_counter)
             new_if = fortran_if(file_ast, line_number, name)
             file_ast.add_scope(new_if, FRegex.END_IF, req_container=True)
             parser_debug_msg("IF", line, line_number)
 
         elif obj_type == "select":
             select_counter += 1
-            name = f"#SELECT{select_counter}"
+            name = _scope_name("#SELECT", select_counter)
             new_select = fortran_select(file_ast, line_number, name, obj_info)
             file_ast.add_scope(new_select, FRegex.END_SELECT, req_container=True)
             new_var = new_select.create_binding_variable(
@@ -1825,7 +2361,7 @@ def process_file(
 
         elif obj_type == "enum":
             block_counter += 1
-            name = f"#ENUM{block_counter}"
+            name = _scope_name("#ENUM", block_counter)
             new_enum = fortran_enum(file_ast, line_number, name)
             file_ast.add_scope(new_enum, FRegex.END_ENUMD, req_container=True)
             parser_debug_msg("ENUM", line, line_number)
@@ -1834,7 +2370,7 @@ def process_file(
             name = obj_info.name
             if name is None:
                 int_counter += 1
-                name = f"#GEN_INT{int_counter}"
+                name = _scope_name("#GEN_INT", int_counter)
             new_int = fortran_int(
                 file_ast, line_number, name, abstract=obj_info.abstract
             )
@@ -1847,19 +2383,18 @@ def process_file(
             )
             new_int.set_visibility(obj_info.vis_flag)
             file_ast.add_scope(new_int, FRegex.END_INT, req_container=True)
-            for pro_link in obj_info.pro_links:
-                file_ast.add_int_member(pro_link)
+            file_ast.add_int_members(obj_info.pro_links)
             file_ast.end_scope(line_number)
             parser_debug_msg("GENERIC", line, line_number)
 
         elif obj_type == "int_pro":
             if file_ast.current_scope is not None:
-                if file_ast.current_scope.get_type() == INTERFACE_TYPE_ID:
-                    for name in obj_info:
-                        file_ast.add_int_member(name)
+                scope_type = file_ast.current_scope.get_type()
+                if scope_type == INTERFACE_TYPE_ID:
+                    file_ast.add_int_members(obj_info)
                     parser_debug_msg("INTERFACE-PRO", line, line_number)
 
-                elif file_ast.current_scope.get_type() == SUBMODULE_TYPE_ID:
+                elif scope_type == SUBMODULE_TYPE_ID:
                     new_impl = fortran_scope(file_ast, line_number, obj_info[0])
                     file_ast.add_scope(new_impl, FRegex.END_PRO)
                     parser_debug_msg("INTERFACE_IMPL", line, line_number)
@@ -1897,15 +2432,14 @@ def process_file(
                     file_ast.current_scope.set_default_vis(-1)
                 else:
                     if obj_info.type == 1:
-                        for word in obj_info.obj_names:
-                            file_ast.add_private(word)
+                        file_ast.add_privates(obj_info.obj_names)
                     else:
-                        for word in obj_info.obj_names:
-                            file_ast.add_public(word)
+                        file_ast.add_publics(obj_info.obj_names)
             parser_debug_msg("Visibility", line, line_number)
 
     file_ast.close_file(line_number)
-    if debug:
+    # Nothing is shown if the logger was already configured above DEBUG
+    if debug and debug_log:
         if len(file_ast.end_errors) > 0:
             log.debug("\n=== Scope Errors ===\n")
             for error in file_ast.end_errors:
@@ -1913,9 +2447,9 @@ def process_file(
                     message = f"Unexpected end of scope at line {error[0]}"
                 else:
                     message = "Unexpected end statement: No open scopes"
-                log.debug(f"{error[1]}: {message}")
+                log.debug("%s: %s", error[1], message)
         if len(file_ast.parse_errors) > 0:
             log.debug("\n=== Parsing Errors ===\n")
             for error in file_ast.parse_errors:
-                log.debug(f"{error['line']}: {error['mess']}")
+                log.debug("%s: %s", error["line"], error["mess"])
     return file_ast
@@ -48,6 +48,8 @@ class FortranRegularExpressions:
     END_SELECT: Pattern = compile(r"SELECT", I)
     PROG: Pattern = compile(r"[ ]*PROGRAM[ ]+([a-z0-9_]+)", I)
     END_PROG: Pattern = compile(r"PROGRAM", I)
+    # End of the implicit main program holding non-module contained items
+    END_NONE_SCOPE: Pattern = compile(r"[ ]*END[ ]*PROGRAM", I)
     INT: Pattern = compile(r"[ ]*(ABSTRACT)?[ ]*INTERFACE[ ]*([a-z0-9_]*)", I)
     END_INT: Pattern = compile(r"INTERFACE", I)
     END_WORD: Pattern = compile(
@@ -116,6 +118,11 @@ class FortranRegularExpressions:
     PP_DEF_TEST: Pattern = compile(r"(![ ]*)?defined[ ]*\([ ]*([a-z0-9_]*)[ ]*\)$", I)
     PP_INCLUDE: Pattern = compile(r"#include[ ]*([\"a-z0-9_\.]*)", I)
     PP_ANY: Pattern = compile(r"(^#:?\w+)")
+    PP_EXPR_TOKEN: Pattern = compile(
+        r"\s*(0x[0-9a-f]+[ul]*|[0-9]+[ul]*|\w+"
+        r"|&&|\|\||[=!<>]=|<<|>>|[-+*/%()<>!~&|^])",
+        I,
+    )
     # Context matching rules
     CALL: Pattern = compile(r"[ ]*CALL[ ]+[a-z0-9_%]*$", I)
     INT_STMNT: Pattern = compile(r"^[ ]*[a-z]*$", I)
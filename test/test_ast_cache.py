@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fortls.ast_cache import FortranASTCache  # noqa: E402
+from fortls.interface import commandline_args  # noqa: E402
+from fortls.parse_fortran import fortran_file, process_file  # noqa: E402
+
+SOURCE = """module cached_mod
+  integer :: a
+contains
+  subroutine sub1(x)
+    real :: x
+  end subroutine sub1
+end module cached_mod
+"""
+
+
+def load_file(path: Path) -> fortran_file:
+    file_obj = fortran_file(str(path))
+    err_str, _ = file_obj.load_from_disk()
+    assert err_str is None
+    return file_obj
+
+
+def scope_names(file_ast) -> list[str]:
+    return [scope.FQSN for scope in file_ast.scope_list]
+
+
+def test_cache_miss_and_put(tmp_path):
+    src = tmp_path / "src.f90"
+    src.write_text(SOURCE)
+    cache = FortranASTCache(str(tmp_path / "cache"))
+    file_obj = load_file(src)
+    assert cache.get(file_obj) is None
+    file_ast = process_file(file_obj)
+    cache.put(file_obj, file_ast)
+    assert os.path.isfile(cache._entry_path(file_obj.path))
+    # Storing the entry must leave the AST attached to its file
+    assert file_ast.file is file_obj
+
+
+def test_cache_hit(tmp_path):
+    src = tmp_path / "src.f90"
+    src.write_text(SOURCE)
+    cache = FortranASTCache(str(tmp_path / "cache"))
+    file_obj = load_file(src)
+    file_ast = process_file(file_obj)
+    cache.put(file_obj, file_ast)
+    # A new session loading the same file
+    new_file = load_file(src)
+    cached_ast = cache.get(new_file)
+    assert cached_ast is not None
+    assert cached_ast.file is new_file
+    assert scope_names(cached_ast) == scope_names(file_ast)
+    assert [v.name for v in cached_ast.variable_list] == ["a", "x"]
+
+
+def test_cache_invalidated_by_changes(tmp_path):
+    src = tmp_path / "src.f90"
+    src.write_text(SOURCE)
+    cache = FortranASTCache(str(tmp_path / "cache"))
+    file_obj = load_file(src)
+    cache.put(file_obj, process_file(file_obj))
+    src.write_text(SOURCE.replace("integer :: a", "integer :: b"))
+    changed_file = load_file(src)
+    assert changed_file.hash != file_obj.hash
+    assert cache.get(changed_file) is None
+    # Same contents but a stale hash recorded in the entry
+    file_obj.hash = "0" * 32
+    assert cache.get(file_obj) is None
+
+
+def test_cache_skips_preprocessed_files(tmp_path):
+    src = tmp_path / "src.F90"
+    src.write_text(SOURCE)
+    cache = FortranASTCache(str(tmp_path / "cache"))
+    file_obj = load_file(src)
+    assert file_obj.preproc
+    cache.put(file_obj, process_file(file_obj))
+    assert not os.path.exists(cache._entry_path(file_obj.path))
+    assert cache.get(file_obj) is None
+
+
+def test_cache_ignores_corrupt_entries(tmp_path):
+    src = tmp_path / "src.f90"
+    src.write_text(SOURCE)
+    cache = FortranASTCache(str(tmp_path / "cache"))
+    file_obj = load_file(src)
+    cache.put(file_obj, process_file(file_obj))
+    entry = Path(cache._entry_path(file_obj.path))
+    # Truncated entry
+    entry.write_bytes(entry.read_bytes()[:20])
+    assert cache.get(file_obj) is None
+    # Not a pickle at all
+    entry.write_bytes(b"not a pickle")
+    assert cache.get(file_obj) is None
+
+
+def test_cache_dir_not_read_from_config_file(tmp_path):
+    from fortls.langserver import LangServer
+
+    config = tmp_path / ".fortls"
+    config.write_text(json.dumps({"nthreads": 3, "cache_dir": "cache"}))
+    args = commandline_args("fortls").parse_args(["-c", str(config)])
+    server = LangServer(None, vars(args))
+    server.root_path = str(tmp_path)
+    server._load_config_file()
+    assert server.nthreads == 3
+    assert server.cache_dir is None
+    # Only the command line can enable the cache
+    args = commandline_args("fortls").parse_args(["--cache_dir", "cache"])
+    server = LangServer(None, vars(args))
+    assert server.cache_dir == os.path.abspath("cache")
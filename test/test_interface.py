@@ -1,6 +1,11 @@
+import json
 import os
+import subprocess
 import sys
 from pathlib import Path
+from unittest import mock
+
+import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
@@ -26,12 +31,14 @@ def test_command_line_general_options():
 def test_command_line_file_parsing_options():
     args = parser.parse_args(
         "--source_dirs tmp ./local /usr/include/** --incl_suffixes .FF .fpc .h f20"
-        " --excl_suffixes _tmp.f90 _h5hut_tests.F90 --excl_paths exclude tests".split()
+        " --excl_suffixes _tmp.f90 _h5hut_tests.F90 --excl_paths exclude tests"
+        " --cache_dir .fortls_cache".split()
     )
     assert args.source_dirs == set(["tmp", "./local", "/usr/include/**"])
     assert args.incl_suffixes == [".FF", ".fpc", ".h", "f20"]
     assert args.excl_suffixes == set(["_tmp.f90", "_h5hut_tests.F90"])
     assert args.excl_paths == set(["exclude", "tests"])
+    assert args.cache_dir == ".fortls_cache"
 
 
 def test_command_line_autocomplete_options():
@@ -97,8 +104,14 @@ def unittest_server_init():
     return server, root
 
 
-def test_config_file_general_options():
-    server, root = unittest_server_init()
+@pytest.fixture(scope="module")
+def server_init():
+    # The tests below only read the configured settings, share one server
+    return unittest_server_init()
+
+
+def test_config_file_general_options(server_init):
+    server, root = server_init
     assert server.nthreads == 8
     assert server.notify_init
     assert server.incremental_sync
@@ -106,8 +119,8 @@ def test_config_file_general_options():
     assert server.disable_autoupdate
 
 
-def test_config_file_dir_parsing_options():
-    server, r = unittest_server_init()
+def test_config_file_dir_parsing_options(server_init):
+    server, r = server_init
     # File parsing
     assert server.source_dirs == set(
         [f'{r/"subdir"}', f'{r/"pp"}', f'{r/"pp"/"include"}']
@@ -117,8 +130,8 @@ def test_config_file_dir_parsing_options():
     assert server.excl_paths == set([f'{r/"excldir"}', f'{r/"hover"}'])
 
 
-def test_config_file_autocomplete_options():
-    server, root = unittest_server_init()
+def test_config_file_autocomplete_options(server_init):
+    server, root = server_init
     # Autocomplete options
     assert server.autocomplete_no_prefix
     assert server.autocomplete_no_snippets
@@ -127,23 +140,23 @@ def test_config_file_autocomplete_options():
     assert server.use_signature_help
 
 
-def test_config_file_hover_options():
-    server, root = unittest_server_init()
+def test_config_file_hover_options(server_init):
+    server, root = server_init
     # Hover options
     assert server.hover_signature
     assert server.hover_language == "FortranFreeForm"
 
 
-def test_config_file_diagnostic_options():
-    server, root = unittest_server_init()
+def test_config_file_diagnostic_options(server_init):
+    server, root = server_init
     # Diagnostic options
     assert server.max_line_length == 80
     assert server.max_comment_line_length == 80
     assert server.disable_diagnostics
 
 
-def test_config_file_preprocessor_options():
-    server, root = unittest_server_init()
+def test_config_file_preprocessor_options(server_init):
+    server, root = server_init
     # Preprocessor options
     assert server.pp_suffixes == [".h", ".fh"]
     assert server.include_dirs == set([f'{root/"include"}'])
@@ -154,14 +167,14 @@ def test_config_file_preprocessor_options():
     }
 
 
-def test_config_file_symbols_options():
-    server, root = unittest_server_init()
+def test_config_file_symbols_options(server_init):
+    server, root = server_init
     # Symbols options
     assert server.symbol_skip_mem
 
 
-def test_config_file_codeactions_options():
-    server, root = unittest_server_init()
+def test_config_file_codeactions_options(server_init):
+    server, root = server_init
     # Code Actions options
     assert server.enable_code_actions
 
@@ -170,6 +183,13 @@ def test_version_update_pypi():
     from fortls.langserver import LangServer
     from fortls.jsonrpc import JSONRPC2Connection, ReadWriter
 
+    # Answer the PyPi query and the pip upgrade locally, the update logic is
+    # tested without depending on the network or modifying the environment
+    pypi_info = json.dumps({"info": {"version": "0.0.0"}}).encode("utf-8")
+    urlopen = mock.MagicMock()
+    urlopen.return_value.__enter__.return_value.read.return_value = pypi_info
+    run = mock.MagicMock(return_value=subprocess.CompletedProcess([], 0, b"", b""))
+
     parser = commandline_args("fortls")
     args = parser.parse_args("-c f90_config.json".split())
     args = vars(args)
@@ -178,5 +198,9 @@ def test_version_update_pypi():
     stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
     s = LangServer(conn=JSONRPC2Connection(ReadWriter(stdin, stdout)), settings=args)
     s.root_path = (Path(__file__).parent / "test_source").resolve()
-    did_update = s._update_version_pypi(test=True)
+    with mock.patch("urllib.request.urlopen", urlopen), mock.patch(
+        "subprocess.run", run
+    ):
+        did_update = s._update_version_pypi(test=True)
     assert did_update
+    assert run.call_args[0][0][-3:] == ["install", "fortls", "--upgrade"]
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import re
+
 from setup_tests import run_request, test_dir, write_rpc_request
 
+from fortls.parse_fortran import find_include_file, preprocess_file
+
 
 def test_hover():
     def hover_req(file_path: str, ln: int, col: int) -> str:
@@ -46,3 +50,62 @@ def test_hover():
     )
     assert len(ref_results) == len(results) - 1
     check_return(results[1:], ref_results)
+
+
+def preprocess_fixture(name: str) -> tuple[list[str], list[str], list[list[int]]]:
+    file_path = test_dir / "pp" / name
+    contents = file_path.read_text().splitlines()
+    output, pp_skips, _, _ = preprocess_file(contents, str(file_path))
+    return contents, output, pp_skips
+
+
+def test_pp_if_expressions():
+    # Lines declaring t_ variables must be kept and f_ ones skipped
+    contents, _, pp_skips = preprocess_fixture("preproc_if.F90")
+
+    def is_skipped(line_number: int) -> bool:
+        return any(start <= line_number <= end for start, end in pp_skips)
+
+    checked = 0
+    for (i, line) in enumerate(contents):
+        match = re.match(r"\s*integer :: ([tf])_(\w+)", line)
+        if match is None:
+            continue
+        checked += 1
+        assert is_skipped(i + 1) == (match.group(1) == "f"), match.group(2)
+    assert checked == 21
+
+
+def test_pp_macro_substitution():
+    # Macros are substituted in order of definition, a macro introduced by a
+    # substitution is only replaced if it was defined after the one introducing it
+    file_path = test_dir / "pp" / "preproc_macros.F90"
+    contents = file_path.read_text().splitlines()
+    ref = [
+        "  integer, parameter :: r = B + 3",
+        "  integer, parameter :: s = A * B",
+        "  integer, parameter :: u = (x + 1)(2)",
+        "  integer, parameter :: v = 3 + AB + B_C",
+    ]
+    output, _, _, _ = preprocess_file(contents, str(file_path))
+    assert output[6:10] == ref
+    assert output[10] == "  real, parameter :: w = M.X"
+    # Macro names that are not plain words can only come from the settings
+    output, _, _, _ = preprocess_file(contents, str(file_path), pp_defs={"M.X": "9.0"})
+    assert output[6:10] == ref
+    assert output[10] == "  real, parameter :: w = 9.0"
+
+
+def test_include_search_order(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    include_dirs = [str(first), str(second)]
+    assert find_include_file("defs.h", include_dirs) is None
+    (second / "defs.h").write_text("")
+    assert find_include_file("defs.h", include_dirs) == str(second / "defs.h")
+    # A header created in an earlier directory takes precedence immediately
+    (first / "defs.h").write_text("")
+    assert find_include_file("defs.h", include_dirs) == str(first / "defs.h")
+    (first / "defs.h").unlink()
+    assert find_include_file("defs.h", include_dirs) == str(second / "defs.h")